@@ -20,7 +20,9 @@ setup(
         "geopandas>=1.0.0",
         "google_api_python_client>=2.1",
         "matplotlib>=3.6",
+        "numba>=0.60",
         "numpy>=2.0.0",
+        "scipy>=1.9",
         "tqdm>=4.5"
     ],
 )
@@ -2,4 +2,7 @@ EVI_G = 2.5  # gain factor
 EVI_C1 = 6.0  # coefficient for aerosol resistance term
 EVI_C2 = 7.5  # coefficient for aerosol resistance termEVI_
 EVI_L = 1.0  # canopy background adjustment
-    
\ No newline at end of file
+    
+
+ATSAVI_A = 0.08  # soil brightness correction factor (user-defined, example value)
+ATSAVI_B = 0.2  # another user-defined coefficient
@@ -1,18 +1,151 @@
-from gge.algorithms.band_math.INCICES_CONF import EVI_G, EVI_C1, EVI_C2, EVI_L
+import numpy as np
+from numba import njit, prange
+from gge.algorithms.band_math.INCICES_CONF import EVI_G, EVI_C1, EVI_C2, EVI_L, ATSAVI_A, ATSAVI_B
+
+# Below this many pixels the plain NumPy expression is cheaper than dispatching to a parallel kernel.
+_JIT_MIN_SIZE = 4096
+
+
+# Per-pixel formulas, inlined into every kernel below so single-index and fused kernels can't drift apart.
+# A zero denominator (e.g. NIR = RED = 0) gives 0 instead of adding a bias to every pixel.
+@njit(inline="always")
+def _ratio(num, den):
+    return num / den if den != 0 else np.float32(0.0)
+
+
+@njit(inline="always")
+def _normalized_difference(a, b):
+    return _ratio(a - b, a + b)
+
+
+@njit(inline="always")
+def _soil_adjusted(r, n, L, gain):
+    # gain * (nir - red) / (nir + red + L), shared by SAVI and OSAVI
+    return gain * _ratio(n - r, n + r + L)
+
+
+@njit(inline="always")
+def _evi(b, r, n):
+    # EVI_* are module globals, so Numba folds them in as compile-time constants and contracts the
+    # denominator into FMAs: nir + C1 * red - C2 * blue
+    return EVI_G * (_ratio(n - r, EVI_C1 * r - EVI_C2 * b + n) + EVI_L)
+
+
+# 1 + a^2 of ATSAVI, folded once here instead of per call
+_ATSAVI_SCALE = 1 + ATSAVI_A**2
+
+
+@njit(inline="always")
+def _atsavi(r, n):
+    # all coefficients are compile-time constants, leaving two FMAs, a multiply and the divide per pixel
+    return _ratio(n - ATSAVI_A * r - ATSAVI_B, (ATSAVI_A * n + r + ATSAVI_B) * _ATSAVI_SCALE)
+
+
+@njit(["f4[:,:](f4[:,:],f4[:,:])"], parallel=True, fastmath=True, cache=True)
+def _normalized_difference_kernel(a, b):
+    H, W = a.shape
+    out = np.empty((H, W), dtype=np.float32)
+    for i in prange(H):
+        for j in range(W):
+            out[i, j] = _normalized_difference(a[i, j], b[i, j])
+    return out
+
+
+@njit(["f4[:,:](f4[:,:],f4[:,:],f4,f4)"], parallel=True, fastmath=True, cache=True)
+def _soil_adjusted_kernel(red, nir, L, gain):
+    H, W = red.shape
+    out = np.empty((H, W), dtype=np.float32)
+    for i in prange(H):
+        for j in range(W):
+            out[i, j] = _soil_adjusted(red[i, j], nir[i, j], L, gain)
+    return out
+
+
+@njit(["f4[:,:](f4[:,:],f4[:,:],f4[:,:])"], parallel=True, fastmath=True, cache=True)
+def _evi_kernel(blue, red, nir):
+    H, W = red.shape
+    out = np.empty((H, W), dtype=np.float32)
+    for i in prange(H):
+        for j in range(W):
+            out[i, j] = _evi(blue[i, j], red[i, j], nir[i, j])
+    return out
+
+
+@njit(["f4[:,:](f4[:,:],f4[:,:])"], parallel=True, fastmath=True, cache=True)
+def _atsavi_kernel(red, nir):
+    H, W = red.shape
+    out = np.empty((H, W), dtype=np.float32)
+    for i in prange(H):
+        for j in range(W):
+            out[i, j] = _atsavi(red[i, j], nir[i, j])
+    return out
+
+
+# Order of the planes the fused kernel can fill; slots[k] is the output plane of index k, or -1 to skip it.
+_FUSED_INDICES = ("NDVI", "NDWI", "GNDVI", "OSAVI", "SAVI", "EVI", "ATSAVI")
+
+
+@njit(["f4[:,:,:](f4[:,:],f4[:,:],f4[:,:],f4[:,:],f4[:,:],i8[:])"], parallel=True, fastmath=True, cache=True)
+def _fused_indices_kernel(red, nir, blue, green, swir, slots):
+    # Every band is loaded once per pixel and all requested indices are written from registers.
+    H, W = red.shape
+    out = np.empty((max(slots.max() + 1, 0), H, W), dtype=np.float32)
+    for i in prange(H):
+        for j in range(W):
+            r = red[i, j]
+            n = nir[i, j]
+            if slots[0] >= 0:
+                out[slots[0], i, j] = _normalized_difference(n, r)
+            if slots[1] >= 0:
+                out[slots[1], i, j] = _normalized_difference(n, swir[i, j])
+            if slots[2] >= 0:
+                out[slots[2], i, j] = _normalized_difference(n, green[i, j])
+            if slots[3] >= 0:
+                out[slots[3], i, j] = _soil_adjusted(r, n, np.float32(0.16), np.float32(1.16))
+            if slots[4] >= 0:
+                out[slots[4], i, j] = _soil_adjusted(r, n, np.float32(0.5), np.float32(1.5))
+            if slots[5] >= 0:
+                out[slots[5], i, j] = _evi(blue[i, j], r, n)
+            if slots[6] >= 0:
+                out[slots[6], i, j] = _atsavi(r, n)
+    return out
+
+
+def _use_kernel(*bands):
+    # The kernels only take same-shaped 2D rasters; everything else (scalars, stacks, tiny tiles) goes through NumPy.
+    first = bands[0]
+    return first.ndim == 2 and first.size >= _JIT_MIN_SIZE and all(band.shape == first.shape for band in bands)
+
+
+def _as_float32(band):
+    # Index values don't need more than float32 precision, and the rasters are memory bound, so every index works in
+    # float32. This is a no-op for bands that already are C-contiguous float32, so callers computing several indices
+    # from the same bands should cast them once up front (e.g. Earth Engine int16 reflectance) rather than per index.
+    return np.asarray(band, dtype=np.float32, order="C")
+
+
+def _safe_divide(num, den):
+    # NumPy counterpart of _ratio: num / den, 0 where den == 0
+    out = np.zeros(np.broadcast(num, den).shape, dtype=np.float32)
+    return np.divide(num, den, out=out, where=den != 0)[()]
 
 
 def compute_ATSAVI(RED, NIR):
 
     # Adjusted transformed soil-adjusted VI (requires red, NIR, and a soil brightness correction factor)
-    # ATSAVI = (B8 - a * B4 - b) / (a * B8 + B4 + b) * (1 + a^2)
-    a = 0.08  # soil brightness correction factor (user-defined, example value)
-    b = 0.2  # another user-defined coefficient
-    return (NIR - a * RED - b) / ((a * NIR + RED + b) * (1 + a**2) + 1e-9)
+    # ATSAVI = (B8 - a * B4 - b) / (a * B8 + B4 + b) * (1 + a^2), a and b are set in INCICES_CONF
+    RED, NIR = _as_float32(RED), _as_float32(NIR)
+    if _use_kernel(RED, NIR):
+        return _atsavi_kernel(RED, NIR)
+    return _safe_divide(NIR - ATSAVI_A * RED - ATSAVI_B, (ATSAVI_A * NIR + RED + ATSAVI_B) * _ATSAVI_SCALE)
 
 
 def compute_NDVI(RED, NIR):
     # Normalized Difference Vegetation Index (requires red and NIR)
-    return (NIR - RED) / ((NIR + RED) + 1e-9)
+    RED, NIR = _as_float32(RED), _as_float32(NIR)
+    if _use_kernel(RED, NIR):
+        return _normalized_difference_kernel(NIR, RED)
+    return _safe_divide(NIR - RED, NIR + RED)
 
 
 def compute_NDWI(NIR, SWIR):
@@ -29,26 +162,125 @@ def compute_NDWI(NIR, SWIR):
             Index values greater than 0.5 usually correspond to water bodies.
             Vegetation usually corresponds to much smaller values and built-up areas to values between zero and 0.2.
     """
-    return (NIR - SWIR) / ((NIR + SWIR) + 1e-9)
+    NIR, SWIR = _as_float32(NIR), _as_float32(SWIR)
+    if _use_kernel(NIR, SWIR):
+        return _normalized_difference_kernel(NIR, SWIR)
+    return _safe_divide(NIR - SWIR, NIR + SWIR)
 
 
 def compute_GNDVI(nir, green):
     # Green Normalized Difference Vegetation Index (requires green and NIR)
-    return (nir - green) / ((green + nir) + 1e-9)
+    nir, green = _as_float32(nir), _as_float32(green)
+    if _use_kernel(nir, green):
+        return _normalized_difference_kernel(nir, green)
+    return _safe_divide(nir - green, green + nir)
 
 
 def compute_OSAVI(red, nir):
     # Optimized Soil Adjusted Vegetation Index (requires red and NIR)
-    return (1.16 * (nir - red)) / ((nir + red + 0.16) + 1e-9)
+    red, nir = _as_float32(red), _as_float32(nir)
+    if _use_kernel(red, nir):
+        return _soil_adjusted_kernel(red, nir, np.float32(0.16), np.float32(1.16))
+    return 1.16 * _safe_divide(nir - red, nir + red + 0.16)
 
 
 def compute_SAVI(red, nir):
     # Soil Adjusted Vegetation Index (requires red and NIR)
     L = 0.5  # soil brightness correction factor (typical value)
-    return ((nir - red) / ((nir + red + L) + 1e-9)) * (1 + L)
+    red, nir = _as_float32(red), _as_float32(nir)
+    if _use_kernel(red, nir):
+        return _soil_adjusted_kernel(red, nir, np.float32(L), np.float32(1 + L))
+    return _safe_divide(nir - red, nir + red + L) * (1 + L)
 
 
 def compute_EVI(blue, red, nir):
     # Enhanced Vegetation Index (requires blue, red, and NIR)
+    blue, red, nir = _as_float32(blue), _as_float32(red), _as_float32(nir)
+    if _use_kernel(blue, red, nir):
+        return _evi_kernel(blue, red, nir)
+    return EVI_G * (_safe_divide(nir - red, nir + EVI_C1 * red - EVI_C2 * blue) + EVI_L)
+
+
+# Bands each index needs, in the order its compute_* function takes them.
+_INDEX_BANDS = {
+    "NDVI": ("red", "nir"),
+    "NDWI": ("nir", "swir"),
+    "GNDVI": ("nir", "green"),
+    "OSAVI": ("red", "nir"),
+    "SAVI": ("red", "nir"),
+    "EVI": ("blue", "red", "nir"),
+    "ATSAVI": ("red", "nir"),
+}
+_INDEX_FUNCTIONS = {
+    "NDVI": compute_NDVI,
+    "NDWI": compute_NDWI,
+    "GNDVI": compute_GNDVI,
+    "OSAVI": compute_OSAVI,
+    "SAVI": compute_SAVI,
+    "EVI": compute_EVI,
+    "ATSAVI": compute_ATSAVI,
+}
+
+
+def compute_indices(bands, names=_FUSED_INDICES):
+    """
+    Compute several indices in a single pass over the bands.
+
+    Calling the compute_* functions one after the other re-reads red/NIR/... from memory for every index. Here each
+    pixel is loaded once and all requested indices are written from it.
+
+    Args:
+        bands (dict): Band arrays keyed by "red", "nir", "blue", "green" and "swir". Only the bands needed by
+            ``names`` have to be present.
+        names (iterable): Indices to compute, any of NDVI, NDWI, GNDVI, OSAVI, SAVI, EVI and ATSAVI.
+
+    Returns:
+        dict: Index name -> float32 array.
+    """
+    names = list(dict.fromkeys(name.upper() for name in names))
+    unknown = [name for name in names if name not in _INDEX_BANDS]
+    if unknown:
+        raise ValueError(f"Unknown indices: {unknown}. Choose from {list(_INDEX_BANDS)}.")
+
+    needed = dict.fromkeys(band for name in names for band in _INDEX_BANDS[name])
+    missing = [band for band in needed if band not in bands]
+    if missing:
+        raise ValueError(f"Bands {missing} are required for {names}.")
+    arrays = {band: _as_float32(bands[band]) for band in needed}
+
+    if not names:
+        return {}
+    if not _use_kernel(*arrays.values()):
+        return {name: _INDEX_FUNCTIONS[name](*(arrays[band] for band in _INDEX_BANDS[name])) for name in names}
+
+    slots = np.full(len(_FUSED_INDICES), -1, dtype=np.int64)
+    for slot, name in enumerate(names):
+        slots[_FUSED_INDICES.index(name)] = slot
+    # bands that aren't needed are never read by the kernel, any same-shaped array can stand in for them
+    placeholder = next(iter(arrays.values()))
+    out = _fused_indices_kernel(*(arrays.get(band, placeholder) for band in ("red", "nir", "blue", "green", "swir")), slots)
+    return {name: out[slot] for slot, name in enumerate(names)}
+
+
+def compute_all_indices(red, nir, blue, green, swir):
+    # All supported indices from one pass over the five bands, see compute_indices
+    return compute_indices({"red": red, "nir": nir, "blue": blue, "green": green, "swir": swir}, _FUSED_INDICES)
+
+
+def _warmup():
+    # The kernels are compiled (or loaded from the on-disk cache) at import thanks to their explicit signatures, but the
+    # first parallel call still starts Numba's threading layer. Do that now, during import, rather than when a user
+    # first asks for an index (e.g. from the GUI).
+    tile = np.zeros((2, 2), dtype=np.float32)
+    try:
+        _normalized_difference_kernel(tile, tile)
+        _soil_adjusted_kernel(tile, tile, np.float32(0.5), np.float32(1.5))
+        _evi_kernel(tile, tile, tile)
+        _atsavi_kernel(tile, tile)
+        _fused_indices_kernel(tile, tile, tile, tile, tile, np.arange(len(_FUSED_INDICES), dtype=np.int64))
+    except Exception:
+        # warming up is only an optimisation, the kernels compile on first use otherwise
+        pass
+
 
-    return EVI_G * ((nir - red) / (nir + EVI_C1 * red - EVI_C2 * blue + 1e-9) + EVI_L)
+_warmup()
@@ -1,14 +1,27 @@
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.widgets import RectangleSelector
+from PIL import Image
 
 # Import sensors using absolute import
 from gge.sensors import Sentinel1, Sentinel2, Landsat
 
 
+def _to_uint8(image_data):
+    """``image_data`` as uint8, anything else (e.g. [0, 1] reflectance or float backscatter) stretched min/max to 0-255."""
+    image_data = np.asarray(image_data)
+    if image_data.dtype == np.uint8:
+        return image_data
+    image_data = image_data.astype(np.float32)
+    low, high = np.nanmin(image_data), np.nanmax(image_data)
+    scaled = (image_data - low) * (255 / (high - low)) if high > low else np.zeros_like(image_data)
+    return np.nan_to_num(scaled).astype(np.uint8)
+
+
 class SatelliteImageTool:
     def __init__(self, master):
         self.master = master
@@ -55,6 +68,8 @@ class SatelliteImageTool:
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         self.rs = RectangleSelector(self.ax, self.line_select_callback, interactive=True, button=[1], minspanx=5, minspany=5)
 
+        self.preview = None  # AxesImage of the fetched image, updated in place by show_preview
+
         self.selected_area = None
         self.image_data = None
 
@@ -90,19 +105,43 @@ class SatelliteImageTool:
             return
 
         self.image_data = data  # Assuming data is returned as a NumPy array
-        self.ax.imshow(self.image_data)
-        self.canvas.draw()
+        self.show_preview(self.image_data)
+
+    def show_preview(self, image_data, size=(800, 800)):
+        # a uint8 thumbnail, so matplotlib only resamples a screen-sized image, shown under the area selector with an
+        # extent of the full image so selections stay in the pixel coordinates of image_data
+        image = Image.fromarray(_to_uint8(image_data))
+        image.thumbnail(size)
+        extent = (0, np.shape(image_data)[1], np.shape(image_data)[0], 0)
+        if self.preview is None:
+            self.preview = self.ax.imshow(np.asarray(image), extent=extent)
+        else:
+            self.preview.set_data(np.asarray(image))
+            self.preview.set_extent(extent)
+        self.canvas.draw_idle()
 
     def save_images_as_npy(self):
         # Save the fetched image data as .npy file
         if self.image_data is not None:
             save_path = filedialog.asksaveasfilename(defaultextension=".npy", filetypes=[("NumPy files", "*.npy")])
             if save_path:
-                np.save(save_path, self.image_data)
-                messagebox.showinfo("Save", f"Image data saved as {save_path}.")
+                # Write on a worker thread so large arrays don't freeze the UI; Tk calls must go back to the main thread
+                threading.Thread(target=self._write_npy, args=(save_path, self.image_data), daemon=True).start()
         else:
             messagebox.showwarning("Save", "No image data to save.")
 
+    def _write_npy(self, save_path, image_data):
+        try:
+            # stream straight into the .npy file instead of building the output in memory first
+            out = np.lib.format.open_memmap(save_path, mode="w+", dtype=image_data.dtype, shape=image_data.shape)
+            np.copyto(out, image_data)
+            out.flush()
+            del out
+        except Exception as e:
+            self.master.after(0, messagebox.showerror, "Save", f"Could not save {save_path}: {e}")
+        else:
+            self.master.after(0, messagebox.showinfo, "Save", f"Image data saved as {save_path}.")
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,6 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
 from gge.landcover.cgls import CGLSLandCover100
 from gge.landcover.corine import CORINELandCover
 from gge.landcover.esawordcover import ESAWorldCover
 from gge.landcover.s2landcover import Sentinel2WorldCover
 
-__all__ = ["CGLSLandCover100", "CORINELandCover", "ESAWorldCover", "Sentinel2WorldCover"]
+__all__ = ["CGLSLandCover100", "CORINELandCover", "ESAWorldCover", "Sentinel2WorldCover", "download_all"]
+
+
+def download_all(area, handlers=(CGLSLandCover100, CORINELandCover, ESAWorldCover, Sentinel2WorldCover)):
+    """
+    Download several land cover products for the same area concurrently.
+
+    The Earth Engine requests are I/O bound, so running them in parallel makes the wall clock time that of the slowest
+    product instead of the sum of all of them.
+
+    Returns:
+        dict: handler class name -> handler with its data downloaded.
+    """
+
+    def _download(handler):
+        data = handler(area)
+        data.download_data()
+        return data
+
+    with ThreadPoolExecutor(max_workers=len(handlers)) as executor:
+        futures = {handler.__name__: executor.submit(_download, handler) for handler in handlers}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,67 @@
+import numpy as np
+import ee
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def class_palette(collection_id, band=None):
+    """
+    Class values, names and colours of a land cover collection as parallel NumPy arrays.
+
+    These are image properties that are the same for every image of a collection, so they are fetched once per session.
+    ``band`` selects the ``<band>_class_*`` properties, without it every ``*_class_values`` property is used.
+
+    Returns:
+        (values (int32, V), names (object, V), colors (float32 RGB in [0, 1], V x 3)), sorted by value and unique: where
+        several class types share a value (CGLS), the first class type's entry is kept
+    """
+    image = ee.ImageCollection(collection_id).first()
+    if band is None:
+        properties = image.toDictionary().getInfo()
+        class_types = [key[:-13] for key in properties if key.endswith("_class_values")]
+    else:
+        properties = image.toDictionary([f"{band}_class_values", f"{band}_class_names", f"{band}_class_palette"]).getInfo()
+        class_types = [band]
+
+    # one pass over the (value, name, colour) triples of every class type, zip stops at the shortest list
+    classes = [
+        (value, name, color.lstrip("#"))
+        for class_type in class_types
+        for value, name, color in zip(
+            properties[class_type + "_class_values"],
+            properties.get(class_type + "_class_names", []),
+            properties.get(class_type + "_class_palette", []),
+        )
+    ]
+    values, names, colors = zip(*classes) if classes else ((), (), ())
+
+    # parse all hex colours in one go, ready to be handed to ListedColormap
+    colors = np.frombuffer(bytes.fromhex("".join(colors)), dtype=np.uint8).reshape(-1, 3).astype(np.float32) / 255
+    # sorted once here, so the min/max of any filtered subset are simply its first/last entries
+    order = np.argsort(values, kind="stable")
+    values = np.asarray(values, dtype=np.int32)[order]
+    # the sort is stable, so np.unique's first index of each value is its entry from the earliest class type
+    _, first = np.unique(values, return_index=True)
+    return values[first], np.asarray(names, dtype=object)[order][first], colors[order][first]
+
+
+def mapping_list(values, names, colors):
+    """The class arrays as the list of {"value", "name", "color" (hex, no "#")} dicts the handlers expose."""
+    hex_colors = [bytes(rgb).hex() for rgb in np.rint(colors * 255).astype(np.uint8)]
+    return [{"value": value, "name": name, "color": color} for value, name, color in zip(values.tolist(), names, hex_colors)]
+
+
+def filter_palette(values, names, colors, data):
+    """Restrict the class arrays returned by class_palette to the classes that occur in ``data``."""
+    data = np.asarray(data).ravel()
+    if len(values) == 0 or data.size == 0:
+        return values[:0], names[:0], colors[:0]
+    if np.issubdtype(data.dtype, np.integer) and data.min() >= 0 and values[0] >= 0:
+        # class values are small non-negative ints: one O(N) histogram pass, then a lookup per class
+        present = np.bincount(data, minlength=values[-1] + 1) > 0
+        mask = present[values]
+    else:
+        present = np.unique(data)
+        # present is sorted, so a value occurs in data iff it is found at its insertion point
+        mask = present[np.minimum(np.searchsorted(present, values), present.size - 1)] == values
+    return values[mask], names[mask], colors[mask]
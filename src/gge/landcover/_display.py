@@ -0,0 +1,58 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from functools import lru_cache
+from matplotlib.colors import ListedColormap, Normalize, BoundaryNorm
+from gge.landcover._classes import filter_palette
+
+
+def _decimate(arr, target=1024):
+    """
+    Nearest-neighbour downsample ``arr`` so its longest side is about ``target`` pixels.
+
+    An 8x8 inch figure only shows ~800x800 pixels, so handing matplotlib a full 10000x10000 land cover tile just makes
+    it copy and resample the whole buffer. Land cover is categorical, so plain striding is safe.
+    """
+    arr = np.asarray(arr)
+    step = max(1, max(arr.shape[:2]) // target)
+    if step == 1:
+        return arr
+    return np.ascontiguousarray(arr[::step, ::step])
+
+
+@lru_cache(maxsize=16)
+def make_cmap(values: tuple, colors: tuple, boundaries: bool = False):
+    """
+    Colormap and norm for sorted class ``values`` with RGB ``colors``, shared by all land cover handlers.
+
+    Cached, so redrawing the same classes doesn't rebuild the colormap. With ``boundaries`` every class gets its own
+    bin [value, next value) through a BoundaryNorm, otherwise the colours are spread linearly between the first and
+    last value.
+    """
+    cmap = ListedColormap(np.asarray(colors, dtype=np.float32))
+    if boundaries:
+        norm = BoundaryNorm(values + (values[-1] + 1,), cmap.N)
+    else:
+        norm = Normalize(vmin=values[0], vmax=values[-1])
+    return cmap, norm
+
+
+def class_cmap(values, names, colors, data, boundaries=False):
+    """(values, names, cmap, norm) for the classes of the class arrays that occur in ``data``."""
+    values, names, colors = filter_palette(values, names, colors, data)
+    cmap, norm = make_cmap(tuple(values.tolist()), tuple(map(tuple, colors.tolist())), boundaries)
+    return values, names, cmap, norm
+
+
+def plot_land_cover(data, values, names, colors, title=None, drawedges=False):
+    """Show a land cover raster with a colorbar labelled with the class names present in it."""
+    values, names, cmap, norm = class_cmap(values, names, colors, data)
+
+    plt.figure(figsize=(8, 8))
+    im = plt.imshow(_decimate(data), cmap=cmap, norm=norm)
+    cbar = plt.colorbar(im, ticks=values, drawedges=drawedges)
+    cbar.ax.set_yticklabels(names)  # Set tick labels
+
+    if title:
+        plt.title(title)
+    plt.axis("off")
+    plt.show()
@@ -4,39 +4,38 @@ import ee
 from gge.sensors.SatelliteData import SatelliteData
 from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
-from matplotlib.colors import ListedColormap, Normalize
+from gge.landcover._classes import class_palette, mapping_list
+from gge.landcover._display import plot_land_cover
 
 
 class CGLSLandCover100(SatelliteData):
+    collection_id = "COPERNICUS/Landcover/100m/Proba-V-C3/Global"
+    pixel_scale = 100
+
     def __init__(self, area: Union[Tuple[float, float, float, float], str, None] = None):
         super().__init__(area)
 
     @timing_decorator
     def download_data(self):
-        collection_id = "COPERNICUS/Landcover/100m/Proba-V-C3/Global"
-        collection = ee.ImageCollection(collection_id).filterBounds(self.area)
+        collection = ee.ImageCollection(self.collection_id).filterBounds(self.area)
         cgls_image = collection.first()
         if cgls_image:
-            self.images_data = self.convert_data(cgls_image)
+            self.images_data = self.convert_data(cgls_image.clip(self.area))
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        cgls_clip = image.clip(self.area)
-        cgls_clip = cgls_clip.sampleRectangle(region=self.area, defaultValue=0).getInfo()
+        land_cover = self.compute_pixels(image.select("discrete_classification"), self.pixel_scale)["discrete_classification"]
 
-        self.mapping_list = []
-        self.geometry = cgls_clip["geometry"]
+        # every classification type of the collection (discrete classification, forest type, ...)
+        self.values, self.names, self.colors = class_palette(self.collection_id)
+        self.geometry = self.area_bounds
 
-        # Dynamically create the mapping list for different classification types
-        for key in cgls_clip["properties"]:
-            if key.endswith("_class_values"):
-                class_type = key.replace("_class_values", "")
-                values = cgls_clip["properties"][key]
-                names = cgls_clip["properties"].get(f"{class_type}_class_names", [])
-                colors = cgls_clip["properties"].get(f"{class_type}_class_palette", [])
-                self.mapping_list.extend([{"value": value, "name": name, "color": color} for value, name, color in zip(values, names, colors)])
+        return {"world_cover": land_cover, "geometry": self.geometry}
 
-        return {"world_cover": cgls_clip["properties"].get("discrete_classification", []), "geometry": self.geometry}
+    @property
+    def mapping_list(self):
+        # list-of-dicts view of the class arrays, built on demand for backwards compatibility
+        return mapping_list(self.values, self.names, self.colors)
 
     def display_world_cover(self):
         if not self.images_data:
@@ -45,37 +44,11 @@ class CGLSLandCover100(SatelliteData):
 
         land_cover_data = self.images_data["world_cover"]
 
-        if not land_cover_data:
+        if land_cover_data.size == 0:
             print("No land cover data found.")
             return
 
-        # Create mappings from the dynamically built mapping_list
-        values = [item["value"] for item in self.mapping_list]
-        names = [item["name"] for item in self.mapping_list]
-        colors = ["#" + item["color"] for item in self.mapping_list]
-
-        # Ensure only values present in the data are used for the colormap
-        unique_values = np.unique(land_cover_data)
-        mask = np.isin(values, unique_values)
-        filtered_values = np.array(values)[mask]
-        filtered_names = np.array(names)[mask]
-        filtered_colors = np.array(colors)[mask]
-
-        # Create colormap and normalization
-        cmap = ListedColormap(filtered_colors)
-        norm = Normalize(vmin=np.min(filtered_values), vmax=np.max(filtered_values))
-
-        # Plotting
-        plt.figure(figsize=(8, 8))
-        im = plt.imshow(land_cover_data, cmap=cmap, norm=norm)
-
-        # Create a colorbar with labels at correct positions
-        cbar = plt.colorbar(im, ticks=filtered_values, drawedges=True)
-        cbar.ax.set_yticklabels(filtered_names)  # Set the labels
-
-        plt.title("CGLS Land Cover 100m Global")
-        plt.axis("off")
-        plt.show()
+        plot_land_cover(land_cover_data, self.values, self.names, self.colors, title="CGLS Land Cover 100m Global", drawedges=True)
 
     def __repr__(self):
         return "<Sentinel2WorldCover Data Handler>"
@@ -4,11 +4,14 @@ import ee
 from gge.sensors.SatelliteData import SatelliteData
 from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
-from matplotlib.colors import ListedColormap, Normalize, BoundaryNorm
 from mpl_toolkits.axes_grid1 import make_axes_locatable
+from gge.landcover._classes import class_palette, mapping_list
+from gge.landcover._display import _decimate, class_cmap, plot_land_cover
 
 
 class Sentinel2WorldCover(SatelliteData):
+    collection_id = "ESA/WorldCover/v200"  # Assuming you meant Sentinel-2 imagery under a different collection ID
+
     def __init__(self, area: Union[Tuple[float, float, float, float], str, None] = None):
         super().__init__(area)
 
@@ -17,8 +20,7 @@ class Sentinel2WorldCover(SatelliteData):
 
     @timing_decorator
     def download_data(self):
-        collection_id = "ESA/WorldCover/v200"  # Assuming you meant Sentinel-2 imagery under a different collection ID
-        collection = ee.ImageCollection(collection_id).filterBounds(self.area)
+        collection = ee.ImageCollection(self.collection_id).filterBounds(self.area)
         sentinel_2_image = collection.first()
 
         self.fixed_grid = self.area.bounds()
@@ -27,7 +29,7 @@ class Sentinel2WorldCover(SatelliteData):
             aligned_image = (
                 sentinel_2_image.reproject(crs=self.target_projection, scale=self.target_scale)
                 .resample("bilinear")  # Align pixels
-                .clip(self.fixed_grid)  # Clip to the fixed grid
+                .clip(self.area)  # Clip to the area, sampleRectangle below only reads its bounding box
             )
 
             # Convert the processed image
@@ -37,24 +39,23 @@ class Sentinel2WorldCover(SatelliteData):
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sentinel_2_clip = image.clip(self.area)
-        sentinel_2_clip = sentinel_2_clip.sampleRectangle(region=self.area, defaultValue=0).getInfo()
+        # the image is clipped by download_data, no need to add another clip to the graph
+        sentinel_2_clip = image.sampleRectangle(region=self.area, defaultValue=0).getInfo()
         self.test = sentinel_2_clip
         landcovers = sentinel_2_clip["properties"]["Map"]
-        landcover_class_names = sentinel_2_clip["properties"]["Map_class_names"]
-        landcover_class_palette = sentinel_2_clip["properties"]["Map_class_palette"]
-        landcover_class_values = sentinel_2_clip["properties"]["Map_class_values"]
         geometry = sentinel_2_clip["geometry"]
 
-        self.mapping_list = [
-            {"value": value, "name": name, "color": color}
-            for value, name, color in zip(landcover_class_values, landcover_class_names, landcover_class_palette)
-        ]
-        landcover_class_names = {value: name for value, name in zip(landcover_class_values, landcover_class_names)}
+        self.values, self.names, self.colors = class_palette(self.collection_id, "Map")
+        landcover_class_names = dict(zip(self.values.tolist(), self.names.tolist()))
 
         self.geometry = geometry
         return {"world_cover": landcovers, "worldcover_class_names": landcover_class_names, "geometry": geometry}
 
+    @property
+    def mapping_list(self):
+        # list-of-dicts view of the class arrays, built on demand for backwards compatibility
+        return mapping_list(self.values, self.names, self.colors)
+
     def display_world_cover2(self):
         if not self.images_data:
             self.logger.warning("No worldcover data available to display.")
@@ -62,26 +63,7 @@ class Sentinel2WorldCover(SatelliteData):
 
         land_cover_data = self.images_data["world_cover"]
 
-        values = [item["value"] for item in self.mapping_list]
-        names = [item["name"] for item in self.mapping_list]
-        colors = ["#" + item["color"] for item in self.mapping_list]
-
-        unique_values = np.unique(land_cover_data)
-
-        mask = np.isin(values, unique_values)
-        filtered_values = np.array(values)[mask].tolist()
-        filtered_names = np.array(names)[mask].tolist()
-        filtered_colors = np.array(colors)[mask].tolist()
-
-        cmap = ListedColormap(filtered_colors)
-        norm = Normalize(vmin=min(filtered_values), vmax=max(filtered_values))
-        plt.figure(figsize=(8, 8))
-        im = plt.imshow(land_cover_data, cmap=cmap, norm=norm)
-        cbar = plt.colorbar(im, ticks=filtered_values)
-        cbar.ax.set_yticklabels(filtered_names)  # Set tick labels
-
-        plt.axis("off")
-        plt.show()
+        plot_land_cover(land_cover_data, self.values, self.names, self.colors)
 
     def display_world_cover(self):
         if not self.images_data:
@@ -91,36 +73,18 @@ class Sentinel2WorldCover(SatelliteData):
         # Extract the land cover data
         land_cover_data = self.images_data["world_cover"]
 
-        # Extract values, names, and colors from the mapping list
-        values = [item["value"] for item in self.mapping_list]
-        names = [item["name"] for item in self.mapping_list]
-        colors = ["#" + item["color"] for item in self.mapping_list]
-
-        # Create a dictionary for easy lookup
-        value_to_name = {value: name for value, name in zip(values, names)}
-        value_to_color = {value: color for value, color in zip(values, colors)}
-
-        # Find unique values in the land cover data
-        unique_values = np.unique(land_cover_data)
-
-        # Filter the values, names, and colors based on the unique values in the data
-        filtered_values = [value for value in unique_values if value in value_to_name]
-        filtered_names = [value_to_name[value] for value in filtered_values]
-        filtered_colors = [value_to_color[value] for value in filtered_values]
-
-        # Create a colormap and normalization instance
-        cmap = ListedColormap(filtered_colors)
-        norm = BoundaryNorm(filtered_values + [max(filtered_values) + 1], cmap.N)
+        # Colormap and normalization for the classes present in the data
+        filtered_values, filtered_names, cmap, norm = class_cmap(self.values, self.names, self.colors, land_cover_data, boundaries=True)
 
         # Plot the land cover data
         fig, ax = plt.subplots(figsize=(8, 8))
-        im = ax.imshow(land_cover_data, cmap=cmap, norm=norm)
+        im = ax.imshow(_decimate(land_cover_data), cmap=cmap, norm=norm)
         ax.axis("off")
 
         # Create a colorbar that matches the height of the image
         divider = make_axes_locatable(ax)
         cax = divider.append_axes("right", size="5%", pad=0.05)
-        cbar = plt.colorbar(im, cax=cax, boundaries=filtered_values + [max(filtered_values) + 1], ticks=filtered_values)
+        cbar = plt.colorbar(im, cax=cax, boundaries=norm.boundaries, ticks=filtered_values)
 
         # Set tick labels using the filtered names
         cbar.set_ticks(filtered_values)
@@ -1,9 +1,63 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from numba import njit
+from scipy.spatial import cKDTree
 from tqdm import tqdm
 from typing import Union, List
 import matplotlib.colors as mcolors
 
+# above this input dimension a k-d tree is no faster than brute force, so BMUs are found with a matrix product instead
+_KDTREE_MAX_DIM = 20
+# upper bound on the (neurons, samples) distance matrix of one batched BMU search, larger inputs are done in chunks
+_BMU_BATCH_BYTES = 64 * 2**20
+
+
+@njit(fastmath=True, cache=True)
+def _train_epoch(weights, w_sqnorm, row_delta_sq, data, lr, sigma, grid_sq):
+    """
+    One online epoch: for every sample find the BMU and pull each neuron towards the sample with a Gaussian
+    neighbourhood of width ``sigma`` around the BMU, using the squared grid distances in ``grid_sq``.
+
+    Updates ``weights`` and ``w_sqnorm`` in place, adds the squared size of every update step to ``row_delta_sq`` and
+    returns the quantization error of every sample.
+    """
+    n_neurons, dim = weights.shape
+    errors = np.empty(data.shape[0])
+    inv_two_sigma_sq = 1.0 / (2.0 * sigma * sigma)
+    for s in range(data.shape[0]):
+        x = data[s]
+
+        # BMU = argmin ||w||^2 - 2 w.x
+        bmu = 0
+        best = np.inf
+        for k in range(n_neurons):
+            dot = 0.0
+            for d in range(dim):
+                dot += weights[k, d] * x[d]
+            dist = w_sqnorm[k] - 2.0 * dot
+            if dist < best:
+                best = dist
+                bmu = k
+
+        for k in range(n_neurons):
+            step = lr * np.exp(-grid_sq[bmu, k] * inv_two_sigma_sq)
+            sqnorm = 0.0
+            delta_sq = 0.0
+            for d in range(dim):
+                delta = step * (x[d] - weights[k, d])
+                weights[k, d] += delta
+                sqnorm += weights[k, d] * weights[k, d]
+                delta_sq += delta * delta
+            w_sqnorm[k] = sqnorm
+            row_delta_sq[k] += delta_sq
+
+        err = 0.0
+        for d in range(dim):
+            diff = x[d] - weights[bmu, d]
+            err += diff * diff
+        errors[s] = np.sqrt(err)
+    return errors
+
 
 class SOM:
     r"""
@@ -84,6 +138,8 @@ class SOM:
     - input_dim (int): Dimensionality of the input data.
     - learning_rate (float): Initial learning rate for the SOM training.
     - epochs (int): Number of iterations over the training dataset.
+    - dtype (numpy dtype): Floating point type of the weights, np.float32 (default) or np.float64. Data is cast to it.
+    - sigma (float): Initial width of the Gaussian neighborhood, in grid cells. Defaults to half the largest grid side.
 
     Returns:
     - None
@@ -102,83 +158,163 @@ class SOM:
     - Proper parameter tuning (learning rate, epochs, neuron grid size) is crucial for effective maps.
     """
 
-    def __init__(self, num_neurons=(20, 20), input_dim=40000, learning_rate=0.1, epochs=100):
+    def __init__(self, num_neurons=(20, 20), input_dim=40000, learning_rate=0.1, epochs=100, sigma=None, dtype=np.float32):
         self.input_dim = input_dim
         self.num_neurons = num_neurons
         self.learning_rate = learning_rate
         self.epochs = epochs
-        self.weights = np.random.random((num_neurons[0] * num_neurons[1], input_dim))
+        self.sigma = sigma if sigma is not None else max(num_neurons) / 2
+        self.weights = np.random.random((num_neurons[0] * num_neurons[1], input_dim)).astype(dtype, copy=False)
+        # squared grid distance between every pair of neurons, so the neighbourhood is a single exp per update. This
+        # (N, N) float32 table is O(N^2) memory, 4 N^2 bytes (400 MB for a 100 x 100 map), and is built in place in
+        # float32 so that at most one more table of the same size is needed on the way
+        rows, cols = np.indices(num_neurons, dtype=np.float32).reshape(2, -1)
+        self._grid_sq = np.subtract.outer(rows, rows)
+        self._grid_sq *= self._grid_sq
+        col_sq = np.subtract.outer(cols, cols)
+        col_sq *= col_sq
+        self._grid_sq += col_sq
+        del col_sq
         self.history = []  # To store the loss at each epoch
+        self._row_delta_sq = np.zeros(len(self.weights), dtype=dtype)  # squared update steps per neuron this epoch
+
+    @property
+    def weights(self):
+        return self._weights
+
+    @weights.setter
+    def weights(self, value):
+        # assigning new weights (e.g. loading a trained map) must not leave the cached norms and tree behind
+        self._weights = value
+        self._w_sqnorm = np.einsum("ij,ij->i", value, value)  # ||w_i||^2, kept in sync with the weights
+        self._kdtree = None  # built on demand over the weights, dropped whenever they change
 
     def train(self, data):
         step_print = max(1, self.epochs // 10)
+        data = np.ascontiguousarray(data, dtype=self.weights.dtype)
+        self._kdtree = None
         weight_changes = []
         for epoch in tqdm(range(self.epochs), desc="Training epochs"):
-            epoch_errors = []
-            prev_weights = np.copy(self.weights)
-            for sample in data:
-                bmu_idx = self.find_bmu(sample)
-                self.update_weights(sample, bmu_idx, epoch)
-                error = np.linalg.norm(sample - self.weights[bmu_idx])
-                epoch_errors.append(error)
-            epoch_loss = np.mean(epoch_errors)
+            decay = np.exp(-epoch / self.epochs)
+            # the per-sample loop runs compiled, with the Gaussian neighbourhood update
+            epoch_errors = _train_epoch(self.weights, self._w_sqnorm, self._row_delta_sq, data, self.learning_rate * decay, self.sigma * decay, self._grid_sq)
+            epoch_loss = np.mean(epoch_errors, dtype=np.float64)
             self.history.append(epoch_loss)
-            weight_change = np.mean(np.linalg.norm(self.weights - prev_weights, axis=1))
+            # accumulated during the epoch, so no copy of the weights is needed to measure how far they moved
+            weight_change = np.mean(np.sqrt(self._row_delta_sq))
+            self._row_delta_sq[:] = 0
             weight_changes.append(weight_change)
             if (epoch + 1) % step_print == 0:
                 tqdm.write(f"Epoch {epoch+1}, Loss: {epoch_loss}, Weight Change: {weight_change}")
 
+    def train_batch(self, data):
+        """
+        Batch SOM: per epoch the BMUs of all samples are found with one matrix product per chunk, then every neuron is
+        set to the mean of the data weighted by the Gaussian neighbourhood around each sample's BMU,
+        ``w_k = sum_s h(k, bmu_s) x_s / sum_s h(k, bmu_s)``. Unlike ``train`` no learning rate is needed, only the
+        neighbourhood width, which shrinks as ``sigma`` does there.
+        """
+        data = np.ascontiguousarray(data, dtype=self.weights.dtype)
+        n_neurons = len(self.weights)
+        step_print = max(1, self.epochs // 10)
+        for epoch in tqdm(range(self.epochs), desc="Training epochs"):
+            bmus, sq_errors = self._bmus_batch(data)
+            epoch_loss = np.mean(np.sqrt(np.maximum(sq_errors, 0)), dtype=np.float64)
+            self.history.append(epoch_loss)
+
+            # per-BMU hit counts and data sums, so the neighbourhood is applied once per neuron pair, not per sample
+            counts = np.bincount(bmus, minlength=n_neurons).astype(self.weights.dtype)
+            sums = np.zeros_like(self.weights)
+            np.add.at(sums, bmus, data)
+            sigma = self.sigma * np.exp(-epoch / self.epochs)
+            h = np.exp(-self._grid_sq / (2 * sigma**2))
+            numerator = h @ sums
+            denominator = h @ counts
+            # a neuron far from every BMU gets ~0 weight from all samples and keeps its weights
+            reached = denominator > 0
+            weights = self.weights.copy()
+            weights[reached] = numerator[reached] / denominator[reached, None]
+            self.weights = weights
+            if (epoch + 1) % step_print == 0:
+                tqdm.write(f"Epoch {epoch+1}, Loss: {epoch_loss}")
+
     def find_bmu(self, sample):
-        distances = np.linalg.norm(self.weights - sample, axis=1)
-        return np.argmin(distances)
+        # ||w - x||^2 = ||w||^2 - 2 w.x + ||x||^2, and ||x||^2 is the same for every neuron
+        return np.argmin(self._w_sqnorm - 2.0 * np.dot(self.weights, sample))
 
     def update_weights(self, sample, bmu_idx, epoch):
-        lr = self.learning_rate * np.exp(-epoch / self.epochs)
-        self.weights[bmu_idx] += lr * (sample - self.weights[bmu_idx])
+        decay = np.exp(-epoch / self.epochs)
+        lr = self.learning_rate * decay
+        sigma = self.sigma * decay
+        theta = np.exp(-self._grid_sq[bmu_idx] / (2 * sigma**2))
+        delta = (lr * theta)[:, None] * (sample - self.weights)
+        self.weights += delta  # through the setter, which refreshes the norms and drops the tree
+        self._row_delta_sq += np.einsum("ij,ij->i", delta, delta)
 
     def detect_anomalies(self, data, threshold=1.5):
-        quantization_errors = np.array([np.linalg.norm(data[i] - self.weights[self.find_bmu(data[i])]) for i in range(len(data))])
+        data = np.ascontiguousarray(data, dtype=self.weights.dtype)
+        if self.input_dim <= _KDTREE_MAX_DIM:
+            # the weights don't change between queries, so nearest neighbours come from a cached k-d tree
+            if self._kdtree is None:
+                self._kdtree = cKDTree(self.weights)
+            quantization_errors, _ = self._kdtree.query(data, k=1, workers=-1)
+        else:
+            _, sq_errors = self._bmus_batch(data)
+            quantization_errors = np.sqrt(sq_errors)
         mean_error = np.mean(quantization_errors)
         std_error = np.std(quantization_errors)
         anomalies = np.where(quantization_errors > mean_error + threshold * std_error)[0]
         return anomalies
 
+    def _bmus_batch(self, data, max_bytes=_BMU_BATCH_BYTES):
+        """BMU index and squared quantization error of every row of ``data``, with one matrix product per chunk."""
+        n_neurons = self.weights.shape[0]
+        chunk = max(1, max_bytes // (n_neurons * self.weights.itemsize))
+        bmus = np.empty(len(data), dtype=np.intp)
+        sq_errors = np.empty(len(data), dtype=self.weights.dtype)
+        for start in range(0, len(data), chunk):
+            x = data[start : start + chunk]
+            bmu = (self._w_sqnorm[:, None] - 2.0 * (self.weights @ x.T)).argmin(axis=0)
+            diff = x - self.weights[bmu]
+            bmus[start : start + chunk] = bmu
+            sq_errors[start : start + chunk] = np.einsum("ij,ij->i", diff, diff)
+        return bmus, sq_errors
+
     def index_to_xy(self, index, width):
         return divmod(index, width)  # Returns (x, y)
 
     def get_activations(self, data):
-        """Generate a matrix of activations for each neuron for given data."""
-        activations = np.zeros((self.num_neurons[0], self.num_neurons[1], data.shape[0]))
-        for i, sample in enumerate(data):
-            bmu_idx = self.find_bmu(sample)
-            x, y = divmod(bmu_idx, self.num_neurons[1])
-            activations[x, y, i] = 1  # Mark the neuron as activated for this sample
+        """BMU index of every sample in ``data``, see ``activations_dense`` for the one-hot (ux, uy, samples) form."""
+        bmus, _ = self._bmus_batch(np.ascontiguousarray(data, dtype=self.weights.dtype))
+        return bmus
+
+    def activations_dense(self, bmus):
+        """One-hot (ux, uy, samples) activation matrix for the BMU indices returned by ``get_activations``."""
+        bmus = np.asarray(bmus)
+        activations = np.zeros((self.num_neurons[0], self.num_neurons[1], bmus.size))
+        x, y = np.divmod(bmus, self.num_neurons[1])
+        activations[x, y, np.arange(bmus.size)] = 1
         return activations
 
     def plot_u_matrix(self):
         """Plots the U-matrix of the SOM."""
         ux, uy = self.num_neurons
+        weights = self.weights.reshape(ux, uy, -1)
         u_matrix = np.zeros((ux, uy))
-        iterator = np.nditer(u_matrix, flags=["multi_index"])
-        while not iterator.finished:
-            x, y = iterator.multi_index
-            weight = self.weights[x * uy + y]
-            count = 0
-            dist = 0
-            if x > 0:  # upper neighbor
-                dist += np.linalg.norm(weight - self.weights[(x - 1) * uy + y])
-                count += 1
-            if x < ux - 1:  # lower neighbor
-                dist += np.linalg.norm(weight - self.weights[(x + 1) * uy + y])
-                count += 1
-            if y > 0:  # left neighbor
-                dist += np.linalg.norm(weight - self.weights[x * uy + (y - 1)])
-                count += 1
-            if y < uy - 1:  # right neighbor
-                dist += np.linalg.norm(weight - self.weights[x * uy + (y + 1)])
-                count += 1
-            u_matrix[x, y] = dist / count
-            iterator.iternext()
+        count = np.zeros((ux, uy))
+
+        # distances between vertical and horizontal neighbours, each added to both cells of the pair
+        dx = np.linalg.norm(weights[1:] - weights[:-1], axis=2)
+        dy = np.linalg.norm(weights[:, 1:] - weights[:, :-1], axis=2)
+        u_matrix[1:] += dx
+        u_matrix[:-1] += dx
+        count[1:] += 1
+        count[:-1] += 1
+        u_matrix[:, 1:] += dy
+        u_matrix[:, :-1] += dy
+        count[:, 1:] += 1
+        count[:, :-1] += 1
+        u_matrix /= np.maximum(count, 1)
 
         plt.imshow(u_matrix, cmap="bone_r")
         plt.colorbar()
@@ -194,7 +330,21 @@ class SOM:
         plt.show()
 
 
-def plot_activations_on_image(image, activations, image_idx, anomalies: Union[List, list, None] = None):
+def plot_activations_on_image(image, activations, image_idx, anomalies: Union[List, list, None] = None, num_neurons=None):
+    """
+    Plot ``image`` next to it with the SOM activation of sample ``image_idx`` overlaid.
+
+    ``activations`` is either the BMU index array from ``SOM.get_activations``, in which case ``num_neurons`` is the
+    grid shape of the SOM, or a dense (ux, uy, samples) matrix from ``SOM.activations_dense``.
+    """
+    activations = np.asarray(activations)
+    if activations.ndim == 1:
+        if num_neurons is None:
+            raise ValueError("num_neurons is required when activations are BMU indices")
+        activation = np.zeros(num_neurons)
+        activation[divmod(int(activations[image_idx]), num_neurons[1])] = 1
+    else:
+        activation = activations[:, :, image_idx]
 
     cmap = mcolors.LinearSegmentedColormap.from_list("ndwi", ["brown", "lightyellow", "blue"], N=256)
 
@@ -211,7 +361,7 @@ def plot_activations_on_image(image, activations, image_idx, anomalies: Union[Li
 
     plt.subplot(1, 2, 2)
     plt.imshow(image, cmap=cmap, norm=norm)
-    plt.imshow(activations[:, :, image_idx], cmap="jet", alpha=0.5)  # Overlay activations
+    plt.imshow(activation, cmap="jet", alpha=0.5)  # Overlay activations
     plt.title("Image with SOM Activations")
     plt.colorbar()
 
@@ -225,5 +375,9 @@ class MidpointNormalize(mcolors.Normalize):
         mcolors.Normalize.__init__(self, vmin, vmax, clip)
 
     def __call__(self, value, clip=None):
-        x, y = [self.vmin, self.midpoint, self.vmax], [0, 0.5, 1]
-        return np.ma.masked_array(np.interp(value, x, y), np.isnan(value))
+        # piecewise linear through (vmin, 0), (midpoint, 0.5), (vmax, 1), clamped to [0, 1] like np.interp
+        v = np.asarray(value, dtype=np.float32)
+        below = (v - self.vmin) * (0.5 / (self.midpoint - self.vmin))
+        above = 0.5 + (v - self.midpoint) * (0.5 / (self.vmax - self.midpoint))
+        out = np.clip(np.where(v < self.midpoint, below, above), 0, 1)
+        return np.ma.masked_array(out, np.isnan(v))
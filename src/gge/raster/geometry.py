@@ -1,5 +1,6 @@
 from rasterio.warp import transform
-from typing import Tuple, List, Union
+from typing import Tuple, List, Union, Sequence
+import numpy as np
 import rasterio
 
 Coordinate = Union[Tuple[int, int], List[Tuple[int, int]]]
@@ -18,17 +19,33 @@ def transform_to_lonlat(transformer, crs, x: int, y: int) -> GeoCoordinate:
     Returns:
         GeoCoordinate: Latitude and longitude.
     """
+    first, second = transform_to_lonlat_batch(transformer, crs, [int(x)], [int(y)])
+    return first[0], second[0]
+
+
+def transform_to_lonlat_batch(transformer, crs, xs: Sequence[int], ys: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Transform many pixel coordinates to geographic coordinates with a single transformer and PROJ call.
+
+    Args:
+        transformer (rasterio.transform.Affine or rasterio.transform.GCPTransformer): Spatial transformer.
+        crs (rasterio.crs.CRS): Coordinate Reference System of the raster.
+        xs (Sequence[int]): X coordinates, as passed to ``transform_to_lonlat``.
+        ys (Sequence[int]): Y coordinates, as passed to ``transform_to_lonlat``.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The coordinates in the same order as ``transform_to_lonlat`` returns them.
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
     if isinstance(transformer, rasterio.transform.GCPTransformer):
-        lon, lat = transformer.xy(
-            int(x), int(y), offset="center"
-        )  # Note the order switch and center offset
+        lon, lat = transformer.xy(xs.tolist(), ys.tolist(), offset="center")  # Note the order switch and center offset
     else:
-        x, y = transformer * (int(x), int(y))
+        lon, lat = transformer * (xs, ys)
 
     if not crs.is_geographic:
-        lon, lat = transform(crs, "EPSG:4326", [x], [y])
-        return lat[0], lon[0]
-    return lon, lat
+        lon, lat = transform(crs, "EPSG:4326", np.asarray(lon).tolist(), np.asarray(lat).tolist())
+        return np.asarray(lat), np.asarray(lon)
+    return np.asarray(lon), np.asarray(lat)
 
 
 def transform_to_indices(transformer, crs, lon: float, lat: float) -> Coordinate:
@@ -44,14 +61,32 @@ def transform_to_indices(transformer, crs, lon: float, lat: float) -> Coordinate
     Returns:
         Coordinate: Pixel row and column.
     """
+    rows, cols = transform_to_indices_batch(transformer, crs, [lon], [lat])
+    return int(rows[0]), int(cols[0])
+
+
+def transform_to_indices_batch(transformer, crs, lons: Sequence[float], lats: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Transform many geographic coordinates to pixel coordinates with a single PROJ and transformer call.
+
+    Args:
+        transformer (rasterio.transform.Affine or rasterio.transform.GCPTransformer): Spatial transformer.
+        crs (rasterio.crs.CRS): Coordinate Reference System of the raster.
+        lons (Sequence[float]): Longitudes.
+        lats (Sequence[float]): Latitudes.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Pixel rows and columns.
+    """
+    lons = np.asarray(lons, dtype=np.float64).tolist()
+    lats = np.asarray(lats, dtype=np.float64).tolist()
     if not crs.is_geographic:
-        lon, lat = transform("EPSG:4326", crs, [lon], [lat])
+        lons, lats = transform("EPSG:4326", crs, lons, lats)
 
     if isinstance(transformer, rasterio.transform.GCPTransformer):
-        y, x = transformer.rowcol(lon, lat)
+        y, x = transformer.rowcol(lons, lats)
     else:
         raise NotImplementedError(
             "Inverse transformation from lat/lon to pixel indices is not supported for GCP-based datasets."
         )
 
-    return int(y), int(x)
+    return np.asarray(y, dtype=np.int64), np.asarray(x, dtype=np.int64)
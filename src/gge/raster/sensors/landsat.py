@@ -3,8 +3,9 @@ import sys
 from typing import Tuple, List, Union, Optional
 import numpy as np
 import rioxarray
+import xarray as xr
 from gge.raster.utils import init_transformer
-from gge.raster.geometry import transform_to_lonlat, transform_to_indices
+from gge.raster.geometry import transform_to_lonlat, transform_to_indices, transform_to_lonlat_batch, transform_to_indices_batch
 from gge.raster.geometry import GeoCoordinate, Coordinate
 from shapely.geometry import Polygon
 from gge.algorithms.band_math.indices import compute_NDVI, compute_EVI, compute_NDWI
@@ -21,11 +22,13 @@ class Landsat:
 
         self.dataset = None
         self._is_valid = False
+        self._extent_polygon = None  # (dataset sizes, polygon) of the last _raster_extent_to_polygon call
 
     def load_data(self, data_path: Optional[str] = None):
 
         self.dataset = rioxarray.open_rasterio(data_path)
         self.transformer, self.crs = init_transformer(data_path)
+        self._extent_polygon = None
 
         self.band_names = {"band_name": self.dataset.long_name, "band_index": self.dataset.band.data.tolist()}
 
@@ -42,7 +45,9 @@ class Landsat:
         if isinstance(rows, list) and isinstance(cols, list):
             if len(rows) != len(cols):
                 raise ValueError("Lists of rows and cols must be of equal length.")
-            return [transform_to_lonlat(self.transformer, self.crs, row, col) for row, col in zip(rows, cols)]
+            # one transformer and PROJ call for all points
+            first, second = transform_to_lonlat_batch(self.transformer, self.crs, rows, cols)
+            return list(zip(first.tolist(), second.tolist()))
         elif isinstance(rows, int) and isinstance(cols, int):
             return transform_to_lonlat(self.transformer, self.crs, rows, cols)
         else:
@@ -61,7 +66,8 @@ class Landsat:
         if isinstance(lats, list) and isinstance(lons, list):
             if len(lats) != len(lons):
                 raise ValueError("Lists of latitudes and longitudes must be of equal length.")
-            return [transform_to_indices(self.transformer, self.crs, lat, lon) for lat, lon in zip(lats, lons)]
+            y, x = transform_to_indices_batch(self.transformer, self.crs, lats, lons)
+            return list(zip(y.tolist(), x.tolist()))
         elif isinstance(lats, float) and isinstance(lons, float):
             return transform_to_indices(self.transformer, self.crs, lats, lons)
         else:
@@ -77,13 +83,15 @@ class Landsat:
         Returns:
         - A shapely Polygon object representing the geographic extent of the raster.
         """
-        c, rows, cols = self.shape()
-        top_left = self.yx(0, 0)
-        top_right = self.yx(0, cols)
-        bottom_right = self.yx(rows, cols)
-        bottom_left = self.yx(rows, 0)
-        geo_coords = [top_left, top_right, bottom_right, bottom_left, top_left]
-        polygon = Polygon(geo_coords)
+        sizes = tuple(self.dataset.sizes.items())
+        if self._extent_polygon is not None and self._extent_polygon[0] == sizes:
+            return self._extent_polygon[1]
+
+        c, rows, cols = self.shape
+        # top left, top right, bottom right, bottom left, transformed in one call
+        corners = self.yx([0, 0, rows, rows], [0, cols, cols, 0])
+        polygon = Polygon(corners + [corners[0]])
+        self._extent_polygon = (sizes, polygon)
         return polygon
 
     def _validate(self) -> bool:
@@ -122,34 +130,14 @@ class Landsat:
         band: Union[int, None] = None,
         y: Union[tuple, Tuple[int, int], None] = None,
         x: Union[tuple, Tuple[int, int], None] = None,
-    ) -> Union[None, np.ndarray]:
+    ) -> Union[None, xr.DataArray]:
 
         # we want to slice like this self.dataset.sel(band = 1, y = slice(0,100), x=slice(0, 100))
         # depending on the intiuts.. However, it is okay to only slice on the band, or x,..
-
-        # band
-        if band is not None and y is None and x is None:
-            return self.dataset.sel(band=band).to_array()[0]
-        # band and y
-        elif band is not None and y is not None and x is not None:
-            return self.dataset.sel(band=band, y=slice(y[0], y[1]), x=slice(x[0], x[1])).to_array()[0]
-        # band and x and y
-        elif band is not None and y is not None and x is None:
-            return self.dataset.sel(band=band, y=slice(y[0], y[1])).to_array()[0]
-        # band and x
-        elif band is not None and y is None and x is not None:
-            return self.dataset.sel(band=band, x=slice(x[0], x[1])).to_array()[0]
-        # y and x
-        elif band is None and y is not None and x is not None:
-            return self.dataset.sel(y=slice(y[0], y[1]), x=slice(x[0], x[1])).to_array()[0]
-        # y
-        elif band is None and y is not None and x is None:
-            return self.dataset.sel(y=slice(y[0], y[1])).to_array()[0]
-        # x
-        elif band is None and y is None and x is not None:
-            return self.dataset.sel(x=slice(x[0], x[1])).to_array()[0]
-        else:
-            return self.dataset.to_array()[0]
+        # open_rasterio already gives a DataArray, so the selection is returned as is (lazy, no copy).
+        # Callers that need a numpy array use .values
+        selection = (("band", band), ("y", slice(y[0], y[1]) if y is not None else None), ("x", slice(x[0], x[1]) if x is not None else None))
+        return self.dataset.sel(**{dim: value for dim, value in selection if value is not None})
 
     def close_dataset(self) -> None:
         """
@@ -196,7 +184,11 @@ class Landsat:
             elif self._item_type.upper() == "NDVI":
                 array = compute_NDVI(bands["SR_B4"], bands["SR_B5"])
             elif self._item_type.upper() == "EVI":
-                array = compute_EVI(bands["SR_B4"], bands["SR_B5"], bands["SR_B2"])
+                # compute_EVI takes (blue, red, nir), which are one band lower on TM and ETM+ than on OLI
+                if landsat_number in (8, 9):
+                    array = compute_EVI(bands["SR_B2"], bands["SR_B4"], bands["SR_B5"])
+                else:
+                    array = compute_EVI(bands["SR_B1"], bands["SR_B3"], bands["SR_B4"])
             elif self._item_type.upper() == "NDWI":
                 if landsat_number == 4 or landsat_number == 5:
                     array = compute_NDWI(bands["SR_B3"], bands["SR_B5"])
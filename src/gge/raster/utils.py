@@ -1,19 +1,17 @@
+import os
+import threading
 import rasterio
+from functools import lru_cache
 from typing import Tuple
 import numpy as np
 
+# guards the file caches below, so concurrent callers don't open the same file twice to fill the same entry
+_cache_lock = threading.RLock()
 
-def init_transformer(
-    filepath: str,
-) -> Tuple[rasterio.transform.Affine, rasterio.crs.CRS]:
-    """Initialize the spatial transformer and CRS from a raster file.
-
-    Args:
-        filepath (str): Path to the raster file.
 
-    Returns:
-        Tuple[rasterio.transform.Affine, rasterio.crs.CRS]: The transformer and CRS of the raster file.
-    """
+@lru_cache(maxsize=128)
+def _read_transformer(filepath: str, mtime_ns: int) -> Tuple[rasterio.transform.Affine, rasterio.crs.CRS]:
+    # mtime_ns is only part of the cache key, so a rewritten file is read again
     with rasterio.open(filepath) as src:
         if src.gcps[0]:
             gcps, crs = src.gcps
@@ -24,7 +22,34 @@ def init_transformer(
         return transformer, crs
 
 
-def load_bands(path_to_band: str) -> np.ndarray:
+@lru_cache(maxsize=16)
+def _read_band(path_to_band: str, mtime_ns: int) -> np.ndarray:
     with rasterio.open(path_to_band) as src1:
         data = src1.read(1)
     return data
+
+
+def init_transformer(
+    filepath: str,
+) -> Tuple[rasterio.transform.Affine, rasterio.crs.CRS]:
+    """Initialize the spatial transformer and CRS from a raster file.
+
+    The result is cached per file and modification time, so reopening the same raster doesn't read its header again.
+
+    Args:
+        filepath (str): Path to the raster file.
+
+    Returns:
+        Tuple[rasterio.transform.Affine, rasterio.crs.CRS]: The transformer and CRS of the raster file.
+    """
+    filepath = os.fspath(filepath)
+    with _cache_lock:
+        return _read_transformer(filepath, os.stat(filepath).st_mtime_ns)
+
+
+def load_bands(path_to_band: str) -> np.ndarray:
+    path_to_band = os.fspath(path_to_band)
+    with _cache_lock:
+        data = _read_band(path_to_band, os.stat(path_to_band).st_mtime_ns)
+    # copy, so callers modifying the band don't modify the cached one
+    return data.copy()
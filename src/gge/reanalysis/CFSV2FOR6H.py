@@ -1,13 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._cube import BandCube
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
 from datetime import datetime
 
 
 class CFSV2FOR6H(SatelliteData):
+    pixel_scale = 22264  # metres, the 0.2 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -16,44 +19,41 @@ class CFSV2FOR6H(SatelliteData):
     ):
         super().__init__(area, time_range)
         self.variables = variables
+        self.cube = None  # BandCube of the last download_data call
 
     @timing_decorator
     def download_data(self):
         collection_id = "NOAA/CFSV2/FOR6H"
-        collection = (
-            ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1]).select(self.variables)
-        )
+        collection = self.filtered_collection(collection_id, self.variables)
 
-        count = collection.size().getInfo()
-        if count == 0:
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, self.variables, self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        # stored band-wise as (time, height, width) arrays, images_data holds views into them
+        self.cube = BandCube.from_payloads(images, self.variables, dtype=np.float32)
+        self.images_data.extend(self.cube.images_data())
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        band_data = {}
-        for var in self.variables:
-            band_data[var] = np.array(sample.get(var).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        # every variable comes back in the one computePixels request, as a field of the structured array
+        pixels = self.compute_pixels(image.select(self.variables), self.pixel_scale)
+        return self._from_payload(self.image_payload(image).getInfo(), pixels)
+
+    def _from_payload(self, payload, pixels):
+        band_data = {var: np.asarray(pixels[var], dtype=np.float32) for var in self.variables}
+        return {"image_bands": band_data, "time": payload["time"], "metadata": payload["metadata"]}
 
     def display_data(self, index, variable):
         data = self.images_data[index]
         if data:
-            plt.figure(figsize=(8, 8))
-            plt.imshow(data["image_bands"][variable], cmap="viridis")
-            plt.colorbar()
-            plt.title(f"{variable} at {data['time']}")
-            plt.axis("off")
-            plt.show()
+            self._image = show_field(self._image, data["image_bands"][variable], "viridis", f"{variable} at {data['time']}")
 
     def __len__(self):
         return len(self.images_data)
@@ -1,55 +1,67 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator, exception_handler
+from gge.util.disk_cache import cache_key, load_images_data, save_images_data
 from typing import Tuple, Union
 from datetime import datetime
 
 
 class JAXAGPMData(SatelliteData):
+    pixel_scale = 11132  # metres, the 0.1 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
         time_range: Union[Tuple[Union[str, datetime], Union[str, datetime]], str, None] = None,
+        use_cache: bool = False,  # keep downloads of completed time ranges on disk, see gge.util.disk_cache
     ):
         super().__init__(area, time_range)
+        self.use_cache = use_cache
 
     @timing_decorator
     def download_data(self):
         collection_id = "JAXA/GPM_L3/GSMaP/v6/operational"
-        collection = (
-            ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1]).select("hourlyPrecipRateGC")
-        )
+        collection = self.filtered_collection(collection_id, ["hourlyPrecipRateGC"])
+
+        key = cache_key(collection_id, self.area.serialize(), ee.List(list(self.time_range)).serialize(), "hourlyPrecipRateGC", self.pixel_scale)
+        # a range the collection may still get images in would be served from the cache forever
+        use_cache = self.use_cache and self.time_range_complete(collection_id)
+        if use_cache:
+            cached = load_images_data(key)
+            if cached is not None:
+                self.images_data.extend(cached)
+                return
 
-        count = collection.size().getInfo()
-        if count == 0:
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, ["hourlyPrecipRateGC"], self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        images_data = [self._from_payload(payload, pixels["hourlyPrecipRateGC"]) for payload, pixels in images]
+        if use_cache:
+            save_images_data(key, images_data)
+        self.images_data.extend(images_data)
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        precip_data = np.array(sample.get("hourlyPrecipRateGC").getInfo())
-        return {"precip_data": precip_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        pixels = self.compute_pixels(image.select("hourlyPrecipRateGC"), self.pixel_scale)["hourlyPrecipRateGC"]
+        return self._from_payload(self.image_payload(image).getInfo(), pixels)
+
+    def _from_payload(self, payload, pixels):
+        precip_data = np.asarray(pixels, dtype=np.float32, order="C")
+        return {"precip_data": precip_data, "time": payload["time"], "metadata": payload["metadata"]}
 
     def display_precipitation(self, index):
         data = self.images_data[index]
         if data:
-            plt.figure(figsize=(8, 8))
-            plt.imshow(data["precip_data"], cmap="Blues")
-            plt.colorbar()
-            plt.title(f"Hourly Precipitation at {data['time']}")
-            plt.axis("off")
-            plt.show()
+            self._image = show_field(self._image, data["precip_data"], "Blues", f"Hourly Precipitation at {data['time']}")
 
     def __len__(self):
         return len(self.images_data)
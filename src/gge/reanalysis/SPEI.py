@@ -1,8 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator, exception_handler
+from gge.util.disk_cache import cache_key, load_images_data, save_images_data
 from typing import Tuple, Union
 from datetime import datetime
 
@@ -19,13 +20,17 @@ class SPEIbaseData(SatelliteData):
 
     """
 
+    pixel_scale = 55660  # metres, the 0.5 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
         time_range: Union[Tuple[Union[str, datetime], Union[str, datetime]], str, None] = None,
         scale_index: int = 1,  # Default scale index for SPEI (e.g., 1 month)
+        use_cache: bool = False,  # keep downloads of completed time ranges on disk, see gge.util.disk_cache
     ):
         super().__init__(area, time_range)
+        self.use_cache = use_cache
         self.scale_index = scale_index
 
     @property
@@ -42,41 +47,45 @@ class SPEIbaseData(SatelliteData):
     @timing_decorator
     def download_data(self):
         collection_id = "projects/sat-io/open-datasets/SPEIbase_v28"
-        collection = (
-            ee.ImageCollection(collection_id)
-            .filterBounds(self.area)
-            .filterDate(self.time_range[0], self.time_range[1])
-            .select(f"SPEI_{self.scale_index}")
-        )
-
-        count = collection.size().getInfo()
-        if count == 0:
+        collection = self.filtered_collection(collection_id, [f"SPEI_{self.scale_index}"])
+
+        key = cache_key(collection_id, self.area.serialize(), ee.List(list(self.time_range)).serialize(), f"SPEI_{self.scale_index}", self.pixel_scale)
+        # a range the collection may still get images in would be served from the cache forever
+        use_cache = self.use_cache and self.time_range_complete(collection_id)
+        if use_cache:
+            cached = load_images_data(key)
+            if cached is not None:
+                self.images_data.extend(cached)
+                return
+
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, [f"SPEI_{self.scale_index}"], self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        images_data = [self._from_payload(payload, pixels[f"SPEI_{self.scale_index}"]) for payload, pixels in images]
+        if use_cache:
+            save_images_data(key, images_data)
+        self.images_data.extend(images_data)
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        spei_data = np.array(sample.get(f"SPEI_{self.scale_index}").getInfo())
-        return {"spei_data": spei_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        pixels = self.compute_pixels(image.select(f"SPEI_{self.scale_index}"), self.pixel_scale)[f"SPEI_{self.scale_index}"]
+        return self._from_payload(self.image_payload(image).getInfo(), pixels)
+
+    def _from_payload(self, payload, pixels):
+        spei_data = np.asarray(pixels, dtype=np.float32, order="C")
+        return {"spei_data": spei_data, "time": payload["time"], "metadata": payload["metadata"]}
 
     def display_spei(self, index):
         data = self.images_data[index]
         if data:
-            plt.figure(figsize=(8, 8))
-            plt.imshow(data["spei_data"], cmap="viridis")
-            plt.colorbar()
-            plt.title(f"SPEI Index at {data['time']}")
-            plt.axis("off")
-            plt.show()
+            self._image = show_field(self._image, data["spei_data"], "viridis", f"SPEI Index at {data['time']}")
 
     def __len__(self):
         return len(self.images_data)
@@ -1,3 +1,4 @@
+from gge.reanalysis._cube import BandCube
 from gge.reanalysis.bio import WorldClimBio
 from gge.reanalysis.CFSV2 import CFSV2Data
 from gge.reanalysis.CFSV2FOR6H import CFSV2FOR6H
@@ -9,6 +10,7 @@ from gge.reanalysis.SPEI import SPEIbaseData
 from gge.reanalysis.surfacetemp import NCEPRESurfaceTemp
 
 __all__ = [
+    "BandCube",
     "WorldClimBio",
     "CFSV2Data",
     "CFSV2FOR6H",
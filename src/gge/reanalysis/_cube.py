@@ -0,0 +1,67 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class BandCube:
+    """
+    Downloaded images as one (time, height, width) array per band, with a datetime64 time axis.
+
+    Reductions over time (``cube.bands[band].mean(axis=(1, 2))``) then run over contiguous memory instead of a Python
+    loop over per-image dicts. ``images_data()`` gives the familiar list-of-dicts view on the same memory.
+    """
+
+    times: np.ndarray  # datetime64[s], (T,)
+    bands: Dict[str, np.ndarray] = field(default_factory=dict)  # band -> (T, H, W)
+    metadata: List[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_payloads(cls, images, bands, dtype=None):
+        """
+        Cube of the (payload, pixels) tuples returned by ``SatelliteData.download_collection``, with the band arrays
+        in ``dtype`` (by default the dtype of the first image).
+        """
+        cube = cls(times=np.array([payload["time"] for payload, _ in images], dtype="datetime64[s]"))
+        cube.metadata = [payload["metadata"] for payload, _ in images]
+        if images:
+            cube.bands = {band: _stack([pixels[band] for _, pixels in images], dtype) for band in bands}
+        return cube
+
+    @classmethod
+    def from_images_data(cls, images_data):
+        """Cube of a list of ``{"image_bands": {...}, "time": ..., "metadata": ...}`` dicts."""
+        images = [({"time": d["time"], "metadata": d["metadata"]}, d["image_bands"]) for d in images_data]
+        bands = list(images_data[0]["image_bands"]) if images_data else []
+        return cls.from_payloads(images, bands)
+
+    def images_data(self):
+        """The cube as the list of per-image dicts the handlers store, the arrays being views into the cube."""
+        # formatted in one bulk cast, the inverse of the datetime64 parse in from_payloads
+        times = np.datetime_as_string(self.times, unit="s").tolist()
+        return [
+            {"image_bands": {band: data[i] for band, data in self.bands.items()}, "time": time, "metadata": metadata}
+            for i, (time, metadata) in enumerate(zip(times, self.metadata))
+        ]
+
+    def __len__(self):
+        return len(self.times)
+
+
+def _stack(arrays, dtype=None):
+    """(T, H, W) array of the T (H, W) ``arrays``, reusing their base when they already are its consecutive slices."""
+    first = np.asarray(arrays[0])
+    base = first.base
+    # download_collection hands out views stack[0], stack[1], ... of one preallocated array per band
+    if (
+        isinstance(base, np.ndarray)
+        and base.shape == (len(arrays),) + first.shape
+        and (dtype is None or base.dtype == dtype)
+        and all(isinstance(a, np.ndarray) and a.base is base and a.ctypes.data == base[i].ctypes.data for i, a in enumerate(arrays))
+    ):
+        return base
+    # allocated once the number of images is known, every image then writes its own slice
+    out = np.empty((len(arrays),) + first.shape, dtype=dtype or first.dtype)
+    for i, array in enumerate(arrays):
+        out[i] = array
+    return out
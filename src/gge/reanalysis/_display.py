@@ -0,0 +1,32 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize
+
+
+def show_field(image, data, cmap, title):
+    """
+    Show the 2D field ``data`` with ``cmap``, reusing the AxesImage ``image`` of a previous call if its figure is open.
+
+    Stepping through the images of a collection then only swaps the array, colormap and norm of one AxesImage
+    instead of building a new figure, axes and colorbar every time. The norm spans the finite values of ``data``, so
+    imshow doesn't have to rescale it itself.
+
+    Returns:
+        the AxesImage, to pass back in on the next call
+    """
+    data = np.asarray(data)
+    norm = Normalize(vmin=np.nanmin(data), vmax=np.nanmax(data))
+    if image is None or not plt.fignum_exists(image.figure.number):
+        fig, ax = plt.subplots(figsize=(8, 8))
+        image = ax.imshow(data, cmap=cmap, norm=norm, interpolation="nearest")
+        fig.colorbar(image, ax=ax)
+        ax.axis("off")
+    else:
+        image.set_data(data)
+        image.set_extent((-0.5, data.shape[1] - 0.5, data.shape[0] - 0.5, -0.5))
+        image.set_cmap(cmap)
+        image.set_norm(norm)
+    image.axes.set_title(title)
+    image.figure.canvas.draw_idle()
+    plt.show()
+    return image
@@ -1,13 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 
 class WorldClimBio(SatelliteData):
+    pixel_scale = 928  # metres, the 30 arc-second native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -27,20 +30,20 @@ class WorldClimBio(SatelliteData):
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        band_data = {"bio01": np.array(sample.get("bio01").getInfo()), "bio12": np.array(sample.get("bio12").getInfo())}
-        return {"image_bands": band_data, "metadata": image.getInfo()["properties"]}
+        # the pixels and the properties are independent requests, so they are fetched at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pixels = executor.submit(self.compute_pixels, image, self.pixel_scale)
+            metadata = executor.submit(image.toDictionary().getInfo)
+            pixels = pixels.result()
+            # stored as int16 in WorldClim
+            band_data = {"bio01": np.asarray(pixels["bio01"], dtype=np.int16), "bio12": np.asarray(pixels["bio12"], dtype=np.int16)}
+            return {"image_bands": band_data, "metadata": metadata.result()}
 
     def display_data(self, variable):
         if self.images_data:
             data = self.images_data[0]  # Only one image expected
             if variable in data["image_bands"]:
-                plt.figure(figsize=(8, 8))
-                plt.imshow(data["image_bands"][variable], cmap="viridis")
-                plt.colorbar()
-                plt.title(f"WorldClim {variable}")
-                plt.axis("off")
-                plt.show()
+                self._image = show_field(self._image, data["image_bands"][variable], "viridis", f"WorldClim {variable}")
 
     def __len__(self):
         return len(self.images_data)
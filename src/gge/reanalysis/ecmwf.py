@@ -1,13 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._cube import BandCube
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator
 from typing import Tuple, Union
 from datetime import datetime
 
 
 class GlobalClimateData(SatelliteData):
+    pixel_scale = 27830  # metres, the 0.25 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -18,49 +21,45 @@ class GlobalClimateData(SatelliteData):
         super().__init__(area, time_range)
         self.variables = variables
         self.cloud_threshold = cloud_threshold  # Not used for ERA5, but kept for consistency with Landsat
+        self._band_names = list(variables)
+        self.cube = None  # BandCube of the last download_data call
 
     @timing_decorator
     def download_data(self):
         collection_id = "ECMWF/ERA5/MONTHLY"
-        collection = (
-            ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1]).select(self.variables)
-        )
+        collection = self.filtered_collection(collection_id, self.variables)
+        # every image of the collection has the same bands, so without variables they are looked up once
+        self._band_names = list(self.variables) or collection.first().bandNames().getInfo()
 
-        count = collection.size().getInfo()
-        if count == 0:
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, self._band_names, self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        # stored band-wise as (time, height, width) arrays, images_data holds views into them
+        self.cube = BandCube.from_payloads(images, self._band_names, dtype=np.float32)
+        self.images_data.extend(self.cube.images_data())
 
     def convert_data(self, image):
-        band_names = image.bandNames().getInfo()
+        if self.variables:
+            image = image.select(self.variables)
+        # every band comes back in the one computePixels request, as a field of the structured array
+        return self._from_payload(self.image_payload(image).getInfo(), self.compute_pixels(image, self.pixel_scale))
 
-        band_data = {}
-        for band in band_names:
-            sample = image.select(band).sampleRectangle(region=self.area, defaultValue=0)
-            band_data[band] = np.array(sample.get(band).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+    def _from_payload(self, payload, pixels):
+        band_data = {band: np.asarray(pixels[band], dtype=np.float32) for band in (pixels.dtype.names if hasattr(pixels, "dtype") else pixels)}
+        return {"image_bands": band_data, "time": payload["time"], "metadata": payload["metadata"]}
 
     def display_variable(self, index, variable, cmap="coolwarm"):
         data = self.images_data[index]
         if data is not None:
             variable_data = data["image_bands"][variable]
-            plt.figure(figsize=(8, 8))
-            plt.imshow(variable_data, cmap=cmap)
-            plt.colorbar()
-            plt.title(f'{variable.capitalize()} at {data["time"]}')
-            plt.axis("off")  # Hide axis
-            plt.show()
-
-    def __class__(self):
-        return "GlobalClimateData"
+            self._image = show_field(self._image, variable_data, cmap, f'{variable.capitalize()} at {data["time"]}')
 
     def __str__(self):
         return "Global Climate Data"
@@ -68,5 +67,5 @@ class GlobalClimateData(SatelliteData):
     def __repr__(self):
         return "GlobalClimateData"
 
-    def __dict__(self):
+    def to_dict(self):
         return {"area": self.area, "time_range": self.time_range, "variables": self.variables, "cloud_threshold": self.cloud_threshold}
@@ -4,10 +4,31 @@ import ee
 from datetime import datetime
 from typing import Tuple, Union
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._cube import BandCube
 from gge.util import exception_handler
 
+_ALLOWED_VARS = frozenset(
+    {
+        "dewpoint_temperature_2m",
+        "temperature_2m",
+        "skin_temperature",
+        "soil_temperature_level_1",
+        "soil_temperature_level_2",
+        "soil_temperature_level_3",
+        "soil_temperature_level_4",
+        "snow_cover",
+        "surface_latent_heat_flux",
+        "surface_net_solar_radiation",
+        "total_precipitation",
+        "total_evaporation_hourly",
+        "total_precipitation_hourly",
+    }
+)
+
 
 class ERA5LandHourly(SatelliteData):
+    pixel_scale = 11132  # metres, the 0.1 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -16,47 +37,50 @@ class ERA5LandHourly(SatelliteData):
     ):
         super().__init__(area, time_range)
         self.variable = variable
+        self.cube = None  # BandCube of the last download_data call
 
     @exception_handler()
     def download_data(self):
         collection_id = "ECMWF/ERA5_LAND/HOURLY"
-        if self._variable is None:
-            collection = ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1])
-        else:
-            collection = (
-                ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1]).select(self._variable)
-            )
+        collection = self.filtered_collection(collection_id, None if self._variable is None else [self._variable])
 
-        count = collection.size().getInfo()
-        if count == 0:
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, [self.variable], self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        # stored band-wise as (time, height, width) arrays, images_data holds views into them
+        self.cube = BandCube.from_payloads(images, [self.variable], dtype=np.float32)
+        self.images_data.extend(self.cube.images_data())
 
     @exception_handler()
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        band_data = np.array(sample.get(self.variable).getInfo())
-        return {"image_bands": {self.variable: band_data}, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        pixels = self.compute_pixels(image.select(self.variable), self.pixel_scale)
+        return self._from_payload(self.image_payload(image).getInfo(), pixels)
+
+    def _from_payload(self, payload, pixels):
+        return {"image_bands": {self.variable: np.asarray(pixels[self.variable], dtype=np.float32)}, "time": payload["time"], "metadata": payload["metadata"]}
 
     def plot_time_series(self):
         data = self.images_data
-        if data is None:
+        if not data:
             self.logger.warning("No data available to plot.")
             return
 
-        time_series = [datetime.strptime(d["time"], "%Y-%m-%dT%H:%M:%S") for d in data]
-        values = [d["image_bands"][self.variable].mean() for d in data]
+        if self.cube is None or len(self.cube) != len(data):
+            # images_data spans several download_data calls, stacked once and kept for the next plot
+            self.cube = BandCube.from_images_data(data)
+        cube = self.cube
+        # one reduction over the contiguous (time, height, width) array
+        values = cube.bands[self.variable].mean(axis=(1, 2), dtype=np.float32)
 
         plt.figure(figsize=(12, 6))
-        plt.plot(time_series, values)
+        plt.plot(cube.times, values)
         plt.title(f"{self.variable} Time Series")
         plt.xlabel("Time")
         plt.ylabel(self.variable)
@@ -65,28 +89,12 @@ class ERA5LandHourly(SatelliteData):
     def display_rgb(self, index):
         raise NotImplementedError
 
-    def __class__(self):
-        return "ERA5LandHourly"
-
     @property
     def variable(self):
         return self._variable
 
     @variable.setter
     def variable(self, value):
-        assert value in [
-            "dewpoint_temperature_2m",
-            "temperature_2m",
-            "skin_temperature",
-            "soil_temperature_level_1",
-            "soil_temperature_level_2",
-            "soil_temperature_level_3",
-            "soil_temperature_level_4",
-            "snow_cover",
-            "surface_latent_heat_flux",
-            "surface_net_solar_radiation",
-            "total_precipitation",
-            "total_evaporation_hourly",
-            "total_precipitation_hourly",
-        ]
+        if value not in _ALLOWED_VARS:
+            raise ValueError(f"Invalid variable {value}, must be one of {sorted(_ALLOWED_VARS)}.")
         self._variable = value
@@ -1,13 +1,16 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import ee
 from gge.sensors.SatelliteData import SatelliteData
+from gge.reanalysis._cube import BandCube
+from gge.reanalysis._display import show_field
 from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
 from datetime import datetime
 
 
 class NCEPRESurfaceTemp(SatelliteData):
+    pixel_scale = 278300  # metres, the 2.5 degree native resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -16,6 +19,7 @@ class NCEPRESurfaceTemp(SatelliteData):
     ):
         super().__init__(area, time_range)
         self._cloud_threshold = cloud_threshold  # Placeholder
+        self.cube = None  # BandCube of the last download_data call
 
     @property
     def cloud_threshold(self):
@@ -31,36 +35,34 @@ class NCEPRESurfaceTemp(SatelliteData):
     @timing_decorator
     def download_data(self):
         collection_id = "NCEP_RE/surface_temp"
-        collection = ee.ImageCollection(collection_id).filterBounds(self.area).filterDate(self.time_range[0], self.time_range[1])
+        collection = self.filtered_collection(collection_id)
 
-        count = collection.size().getInfo()
-        if count == 0:
+        # all images in one request, or their metadata in one and their pixels concurrently for large requests
+        try:
+            images = self.download_collection(collection, ["surface_temp"], self.pixel_scale)
+        except Exception as e:
+            self.logger.error(f"Error downloading images from {collection_id}: {e}")
+            return
+        if not images:
             self.logger.info(f"No images found in collection {collection_id} for the given filters.")
             return
 
-        image_list = collection.toList(count)
-        for i in range(count):
-            image = ee.Image(image_list.get(i))
-            try:
-                self.images_data.append(self.convert_data(image))
-            except Exception as e:
-                self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
+        # stored band-wise as (time, height, width) arrays, images_data holds views into them
+        self.cube = BandCube.from_payloads(images, ["surface_temp"], dtype=np.float32)
+        self.images_data.extend(self.cube.images_data())
 
     @exception_handler(default_return_value={})
     def convert_data(self, image):
-        sample = image.sampleRectangle(region=self.area, defaultValue=0)
-        temp_data = np.array(sample.get("surface_temp").getInfo())
-        return {"image_bands": {"surface_temp": temp_data}, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        pixels = self.compute_pixels(image.select("surface_temp"), self.pixel_scale)
+        return self._from_payload(self.image_payload(image).getInfo(), pixels)
+
+    def _from_payload(self, payload, pixels):
+        return {"image_bands": {"surface_temp": np.asarray(pixels["surface_temp"], dtype=np.float32)}, "time": payload["time"], "metadata": payload["metadata"]}
 
     def display_temperature(self, index):
         data = self.images_data[index]
         if data:
-            plt.figure(figsize=(8, 8))
-            plt.imshow(data["image_bands"]["surface_temp"], cmap="coolwarm")
-            plt.colorbar()
-            plt.title(f"Surface Temperature at {data['time']}")
-            plt.axis("off")
-            plt.show()
+            self._image = show_field(self._image, data["image_bands"]["surface_temp"], "coolwarm", f"Surface Temperature at {data['time']}")
 
     def __len__(self):
         return len(self.images_data)
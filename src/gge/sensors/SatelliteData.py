@@ -8,10 +8,199 @@ from gge.util.logger import setup_logging
 from gge.util import exception_handler
 import sys
 import numpy as np
-import gc
 import time
 import os
+import math
+import io
+import urllib.request
+import matplotlib.image as mpimg
+import logging
+import weakref
+from functools import lru_cache
+from dataclasses import is_dataclass, fields
 from tqdm import tqdm
+from numba import njit, prange
+from concurrent.futures import ThreadPoolExecutor
+
+# sampleRectangle refuses regions of more pixels than this
+_SAMPLE_RECTANGLE_MAX_PIXELS = 262144
+# most values (images x pixels x bands) download_collection fetches as JSON in a single request
+_SINGLE_REQUEST_MAX_VALUES = 4_000_000
+
+# export tasks are polled after 1 s at first, backing off to once a minute
+_TASK_POLL_FIRST = 1.0
+_TASK_POLL_MAX = 60.0
+_ACTIVE_TASK_STATES = frozenset(["UNSUBMITTED", "READY", "RUNNING", "CANCEL_REQUESTED"])
+
+_RGB_PARAM_NAMES = np.array(["Gamma", "Gain", "Red", "Green", "Blue"])
+
+
+@njit(inline="always")
+def _to_uint8(value, scale):
+    # clip to [0, scale] and truncate like np.clip(...).astype(np.uint8), NaN becomes 0
+    if not value > 0:
+        return np.uint8(0)
+    return np.uint8(int(min(value, scale)))
+
+
+@njit(inline="always")
+def _gamma(value, gamma):
+    # value ** gamma for the normalized value, exp(gamma * log(value)) being cheaper than the general pow
+    if gamma == 1.0:
+        return value
+    if gamma == 2.0:
+        # the common integer gammas are plain multiplications
+        return value * value
+    if gamma == 3.0:
+        return value * value * value
+    if value > 0.0:
+        return math.exp(gamma * math.log(value))
+    # 0 and NaN keep the pow semantics (0 ** 0 == 1, NaN ** 0 == 1)
+    return value**gamma
+
+
+# fastmath without the no-NaN/no-inf assumptions, so NaN and division by zero behave as in NumPy
+@njit(parallel=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+def _rgb_kernel(bands, out, min_val, inv_range, gamma, gain, channel_gains, scale):
+    """
+    Normalize, gamma correct, gain and scale ``bands`` (H x W x C) into the uint8 ``out`` in a single pass.
+
+    A single band is used for all three channels and two bands get (c0 + c1) / (c0 - c1) as third channel. The red,
+    green and blue gains apply to the first three channels.
+    """
+    height, width, n_bands = bands.shape
+    for i in prange(height):
+        for j in range(width):
+            if n_bands == 1:
+                v = _gamma((bands[i, j, 0] - min_val) * inv_range, gamma) * gain
+                for c in range(3):
+                    out[i, j, c] = _to_uint8(v * channel_gains[c] * scale, scale)
+            elif n_bands == 2:
+                c0 = _gamma((bands[i, j, 0] - min_val) * inv_range, gamma) * gain * channel_gains[0]
+                c1 = _gamma((bands[i, j, 1] - min_val) * inv_range, gamma) * gain * channel_gains[1]
+                out[i, j, 0] = _to_uint8(c0 * scale, scale)
+                out[i, j, 1] = _to_uint8(c1 * scale, scale)
+                out[i, j, 2] = _to_uint8((c0 + c1) / (c0 - c1) * channel_gains[2] * scale, scale)
+            else:
+                for c in range(n_bands):
+                    v = _gamma((bands[i, j, c] - min_val) * inv_range, gamma) * gain
+                    if c < 3:
+                        v *= channel_gains[c]
+                    out[i, j, c] = _to_uint8(v * scale, scale)
+
+
+# ee objects are only client-side descriptions, so instances for the same input can be shared between handlers
+@lru_cache(maxsize=None)
+def _initialize_earth_engine():
+    # once per process; a failed attempt raises and is not cached, so the next handler tries again
+    if ee.data._initialized:
+        return
+    logger = setup_logging()
+    logger.info("Initializing Earth Engine...")
+    try:
+        ee.Initialize()
+    except Exception as e:
+        logger.error(f"Error initializing Earth Engine: {e}. Reauthenticate with ee.Authenticate()")
+        try:
+            ee.Authenticate()
+        except:
+            pass
+        raise e
+    logger.info("Earth Engine initialized.")
+
+
+@lru_cache(maxsize=256)
+def _rect(bounds: tuple) -> ee.Geometry:
+    return ee.Geometry.Rectangle(bounds)
+
+
+@lru_cache(maxsize=256)
+def _date(value) -> ee.Date:
+    return ee.Date(value)
+
+
+@lru_cache(maxsize=64)
+def _filtered(collection_id: str, area: ee.Geometry, start: ee.Date, end: ee.Date, bands: Union[tuple, None]) -> ee.ImageCollection:
+    # ee objects hash by their expression, so handlers over the same area and dates share one collection
+    collection = ee.ImageCollection(collection_id).filterBounds(area).filterDate(start, end)
+    return collection if bands is None else collection.select(list(bands))
+
+
+def _band_stacks(bands, n_images, shape, dtype):
+    return {band: np.empty((n_images,) + tuple(shape), dtype=dtype) for band in bands}
+
+
+def _band_block(arrays, dtype):
+    """
+    The arrays of the ``arrays`` dict as views into one contiguous (band, height, width) ``dtype`` block, so the bands
+    of an image sit next to each other in memory. Bands of differing shapes are returned as separate arrays.
+    """
+    arrays = {band: np.asarray(values) for band, values in arrays.items()}
+    shapes = {array.shape for array in arrays.values()}
+    if len(shapes) != 1:
+        return {band: np.ascontiguousarray(array, dtype=dtype) for band, array in arrays.items()}
+    block = np.empty((len(arrays),) + shapes.pop(), dtype=dtype)
+    for i, array in enumerate(arrays.values()):
+        block[i] = array
+    return dict(zip(arrays, block))
+
+
+# size().getInfo() per collection, dropped together with the collection
+_collection_sizes = weakref.WeakKeyDictionary()
+
+
+@lru_cache(maxsize=64)
+def _sorted_bands(bands: frozenset) -> tuple:
+    # the same few band combinations are plotted over and over, e.g. while tuning gamma and gain
+    return tuple(sorted(bands))
+
+
+@lru_cache(maxsize=32)
+def _load_area_file(filepath: str, mtime_ns: int) -> ee.Geometry:
+    # mtime_ns is only part of the cache key, so an edited file is read again
+    if filepath.endswith(".geojson"):
+        with open(filepath, "r") as file:
+            geojson = json.load(file)
+
+        # bounding box of all features computed by GEOS, for any geometry type (Polygon, MultiPolygon, Point, ...)
+        min_lon, min_lat, max_lon, max_lat = gpd.GeoDataFrame.from_features(geojson["features"]).total_bounds
+        return ee.Geometry.Rectangle((float(min_lon), float(min_lat), float(max_lon), float(max_lat)))
+
+    elif filepath.endswith(".shp"):
+        # only the first feature is used, so only that one is read
+        gdf = gpd.read_file(filepath, engine="pyogrio", rows=1)
+        if gdf.crs is None:
+            # a shapefile without .prj is taken to be in polar stereographic north, as it always was
+            logging.info("Shapefile has no CRS, assuming EPSG:3413")
+            gdf = gdf.set_crs("EPSG:3413")
+        # a no-op for files that already are in EPSG:4326
+        gdf = gdf.to_crs(epsg=4326)
+
+        # straight from the shapely geometry, without a GeoJSON string in between
+        return ee.Geometry(gdf.geometry.iloc[0].__geo_interface__)
+
+    else:
+        raise ValueError("File format not supported.")
+
+
+def _size(obj, seen):
+    """Bytes held by ``obj``, recursing into containers; every array buffer and container is counted once."""
+    if isinstance(obj, np.ndarray):
+        # views (e.g. images_data entries of a BandCube) share the buffer of their base array
+        while isinstance(obj.base, np.ndarray):
+            obj = obj.base
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_size(key, seen) + _size(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(_size(item, seen) for item in obj)
+    if is_dataclass(obj):
+        return sys.getsizeof(obj) + sum(_size(getattr(obj, f.name), seen) for f in fields(obj))
+    return sys.getsizeof(obj)
 
 
 class SatelliteData(ABC):
@@ -21,29 +210,19 @@ class SatelliteData(ABC):
         time_range: Union[Tuple[Union[str, datetime], Union[str, datetime]], str, None] = None,
     ):
         self.logger = setup_logging()
-
-        if not ee.data._initialized:
-            self.logger.info("Initializing Earth Engine...")
-            try:
-                ee.Initialize()
-            except Exception as e:
-                self.logger.error(f"Error initializing Earth Engine: {e}. Reauthenticate with ee.Authenticate()")
-                try:
-                    ee.Authenticate()
-                except:
-                    pass
-                raise e
-            self.logger.info("Earth Engine initialized.")
+        _initialize_earth_engine()
         self.area = area
         self.time_range = time_range
         self.filters = []
         self.images_data = []
+        self._image = None  # AxesImage the display methods draw into, reused between calls
 
         # this is for uploading images to google drive
         self.google_drive_folder = os.environ["google_drive_folder"]
         self.scale = 10
         self.max_pixels = 1e13
         self.allow_upload = False
+        self.use_cache = False  # opt in: handlers that support it keep downloads in gge.util.disk_cache
 
     @property
     def area(self):
@@ -56,70 +235,234 @@ class SatelliteData(ABC):
 
         """
         if isinstance(value, tuple) and len(value) == 4:
-            self._area = ee.Geometry.Rectangle(value)
+            self._area = _rect(value)
         elif isinstance(value, str):
             self._area = self.load_geojson_or_shapefile(value)
         elif value is None:
             self._area = None
         else:
             raise ValueError("Invalid area input.")
+        self._area_bounds = None
+        self._area_bbox = None
+        if isinstance(value, tuple) and len(value) == 4:
+            # a rectangle is its own bounding box, no need to ask Earth Engine for it
+            x_min, x_max = sorted(value[0::2])
+            y_min, y_max = sorted(value[1::2])
+            ring = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max], [x_min, y_min]]
+            self._area_bounds = {"type": "Polygon", "coordinates": [ring]}
 
-    @exception_handler(default_return_value={})
-    def load_geojson_or_shapefile(self, filepath):
+    @property
+    def area_bounds(self):
+        """GeoJSON polygon of the bounding box of ``self.area``, fetched once per area."""
+        if self._area_bounds is None:
+            self._area_bounds = self.area.bounds().getInfo()
+        return self._area_bounds
 
-        if filepath.endswith(".geojson"):
-            with open(filepath, "r") as file:
-                geojson = json.load(file)
+    @property
+    def area_bbox(self):
+        """
+        The bounding box of ``self.area`` as a literal polygon, built once per area. Requests using it carry five
+        vertices instead of the whole area geometry (or a bounds() computation on it).
+        """
+        if self._area_bbox is None:
+            self._area_bbox = ee.Geometry(self.area_bounds)
+        return self._area_bbox
+
+    def pixel_grid(self, scale):
+        """EPSG:4326 pixel grid covering the bounding box of ``self.area`` at roughly ``scale`` metres per pixel."""
+        lons, lats = zip(*self.area_bounds["coordinates"][0])
+        step = scale / 111320  # metres to degrees of latitude
+        # a degree of longitude shrinks with cos(latitude); without this the width is oversampled away from the equator
+        step_x = step / max(math.cos(math.radians((min(lats) + max(lats)) / 2)), 1e-6)
+        return {
+            "dimensions": {"width": max(1, round((max(lons) - min(lons)) / step_x)), "height": max(1, round((max(lats) - min(lats)) / step))},
+            "affineTransform": {"scaleX": step_x, "shearX": 0, "translateX": min(lons), "shearY": 0, "scaleY": -step, "translateY": max(lats)},
+            "crsCode": "EPSG:4326",
+        }
+
+    def compute_pixels(self, image, scale):
+        """
+        Fetch ``image`` over the bounding box of ``self.area`` as a structured NumPy array with one field per band.
 
-                min_lon, min_lat = float("inf"), float("inf")
-                max_lon, max_lat = float("-inf"), float("-inf")
+        Unlike ``sampleRectangle(...).getInfo()`` the pixels are transferred as raw binary rather than a nested JSON list,
+        so nothing has to be decoded in Python. Masked pixels are returned as 0, like ``defaultValue=0``.
+        """
+        return ee.data.computePixels({"expression": image.unmask(0), "fileFormat": "NUMPY_NDARRAY", "grid": self.pixel_grid(scale)})
 
-                # Iterate through features and extract coordinates
-                for feature in geojson["features"]:
-                    coordinates = feature["geometry"]["coordinates"][0]  # Assuming a Polygon
-                    for lon, lat in coordinates:
-                        min_lon = min(min_lon, lon)
-                        max_lon = max(max_lon, lon)
-                        min_lat = min(min_lat, lat)
-                        max_lat = max(max_lat, lat)
+    def image_payload(self, image, bands=None, region=None):
+        """
+        Server-side dictionary with the asset id (``"id"``, None for computed images), date (``"time"``) and properties
+        (``"metadata"``) of ``image`` and, if ``bands`` are given, those bands sampled over ``region`` (``"bands"``, by
+        default over ``self.area_bbox``, which sampleRectangle reads just the same as the area itself). Nothing is
+        fetched until ``getInfo()``.
+        """
+        image = ee.Image(image)
+        payload = ee.Dictionary({"id": image.get("system:id"), "time": image.date().format(), "metadata": image.toDictionary()})
+        if bands:
+            sample = image.select(bands).sampleRectangle(region=self.area_bbox if region is None else region, defaultValue=0)
+            payload = payload.set("bands", sample.toDictionary(bands))
+        return payload
+
+    def convert_images(self, images, max_workers=8, convert=None):
+        """
+        ``convert_data`` (or ``convert``) of every image in ``images``, run concurrently since each one mostly waits on
+        Earth Engine.
 
-                # Resulting bounding box
-                bounding_box = (min_lon, min_lat, max_lon, max_lat)
-                area = ee.Geometry.Rectangle(bounding_box)
+        Returns:
+            list of the converted images in the order of ``images``, None for the images that failed (and were logged)
+        """
 
-            # area = ee.Geometry(geojson["features"][0]["geometry"])
-            del geojson
-            return area
+        convert = self.convert_data if convert is None else convert
 
-        elif filepath.endswith(".shp"):
-            gdf = gpd.read_file(filepath)
+        def _safe_convert(image):
             try:
-                gdf.set_crs("EPSG:3413", inplace=True)
-                gdf = gdf.to_crs(epsg=4326)
+                return convert(image)
             except Exception as e:
-                self.logger.info(f"CRS is {gdf.crs} (with {e})")
+                self.logger.error(f"Error converting image: {e}")
+                return None
 
-            geojson_str = gdf.to_json()
-            geojson = json.loads(geojson_str)
-            area = ee.Geometry(geojson["features"][0]["geometry"])
-            del gdf, geojson_str, geojson
-            return area
+        if not images:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+            return list(tqdm(executor.map(_safe_convert, images), total=len(images), desc="Converting images", leave=False))
 
-        else:
-            raise ValueError("File format not supported.")
+    def sample_image(self, image, bands=None, scale=None, region=None, dtype=np.float32, binary=False):
+        """
+        ``image`` as the ``{"image_bands", "time", "metadata"}`` dict the sensor handlers store, fetched in one
+        ``getInfo()``: every band in ``bands`` (all bands of the image without it) is sampled over ``region`` (by
+        default the bounding box of ``self.area``) in a single ``sampleRectangle``, together with the date and properties.
+
+        Areas of more than ``_SAMPLE_RECTANGLE_MAX_PIXELS`` pixels at ``scale`` metres, which sampleRectangle refuses,
+        are fetched as binary through ``compute_pixels`` on the EPSG:4326 grid instead, the date and properties then
+        coming in a second request. With ``binary`` they always are, which also puts every band on the one grid.
+
+        The bands are returned as ``dtype`` arrays, float32 by default: it holds the 16 bit DN exactly and is plenty for
+        reflectance and backscatter, at half the memory of the float64 JSON lists decode to. They are views into one
+        contiguous (band, height, width) block when they share a shape.
+        """
+        image = ee.Image(image)
+        # all properties, system ones (system:time_start, system:index, ...) included, as image.getInfo() has them
+        metadata = image.toDictionary(image.propertyNames())
+        if scale is not None:
+            dimensions = self.pixel_grid(scale)["dimensions"]
+            if binary or dimensions["width"] * dimensions["height"] > _SAMPLE_RECTANGLE_MAX_PIXELS:
+                pixels = self.compute_pixels(image if bands is None else image.select(list(bands)), scale)
+                payload = self.image_payload(image).set("metadata", metadata).getInfo()
+                band_data = _band_block({band: pixels[band] for band in pixels.dtype.names}, dtype)
+                return {"image_bands": band_data, "time": payload["time"], "metadata": payload["metadata"]}
+
+        payload = self.image_payload(image, image.bandNames() if bands is None else list(bands), region)
+        payload = payload.set("metadata", metadata).getInfo()
+        band_data = _band_block(payload["bands"], dtype)
+        return {"image_bands": band_data, "time": payload["time"], "metadata": payload["metadata"]}
+
+    def filtered_collection(self, collection_id, bands=None):
+        """
+        ``collection_id`` filtered to ``self.area`` and ``self.time_range``, restricted to ``bands`` if given.
+
+        The collection is cached on its arguments, so several handlers (or downloads) over the same area and time range
+        share it, and with it the ``collection_size`` round trip.
+        """
+        return _filtered(collection_id, self.area, self.time_range[0], self.time_range[1], tuple(bands) if bands else None)
+
+    def time_range_complete(self, collection_id):
+        """
+        Whether ``collection_id`` already has images from after ``self.time_range``, so no more can arrive within it
+        and a download of the range can be cached. Ranges reaching the present of a growing collection can't.
+        """
+        end = self.time_range[1]
+        later = ee.ImageCollection(collection_id).filterDate(end, end.advance(1000, "year")).limit(1)
+        return later.size().getInfo() > 0
+
+    def collection_size(self, collection):
+        """``collection.size().getInfo()``, fetched once per collection."""
+        try:
+            return _collection_sizes[collection]
+        except KeyError:
+            size = _collection_sizes[collection] = collection.size().getInfo()
+            return size
+
+    def collection_images(self, collection):
+        """
+        Every image of ``collection``, in collection order, as ``ee.Image(asset_id)``.
+
+        The asset ids come in one ``getInfo()`` that takes the place of ``collection_size``, and each image is then a
+        plain asset lookup instead of a ``toList(...).get(i)`` that makes Earth Engine list the filtered collection again
+        for every image. Only for collections of stored images, computed images have no ``system:id``.
+        """
+        ids = collection.aggregate_array("system:id").getInfo()
+        _collection_sizes[collection] = len(ids)
+        return [ee.Image(image_id) for image_id in ids]
+
+    def collection_payloads(self, collection, bands=None):
+        """``image_payload`` of every image in ``collection``, fetched with a single ``getInfo()`` round trip."""
+        return collection.toList(collection.size()).map(lambda image: self.image_payload(image, bands)).getInfo()
+
+    def download_collection(self, collection, bands, scale, max_workers=8, dtype=np.float32):
+        """
+        Date, properties and pixels of every image in ``collection``.
+
+        Small requests (a grid of at most ``_SAMPLE_RECTANGLE_MAX_PIXELS`` and ``_SINGLE_REQUEST_MAX_VALUES`` values in
+        total) come back in a single ``getInfo()``, with the pixels sampled server side. Otherwise the dates and
+        properties come in one ``getInfo()`` and the pixels of each image through ``compute_pixels``, fetched
+        concurrently.
+
+        The pixels are written into one preallocated (image, height, width) array of ``dtype`` per band as they arrive,
+        so ``BandCube.from_payloads`` can adopt those arrays without copying.
+
+        Returns:
+            list of (payload, pixels) tuples, pixels being a dict with one array (a view into the band stack) per band
+        """
+        dimensions = self.pixel_grid(scale)["dimensions"]
+        n_pixels = dimensions["width"] * dimensions["height"]
+        if n_pixels <= _SAMPLE_RECTANGLE_MAX_PIXELS:
+            # small enough for sampleRectangle, so if the whole collection also is, everything comes in one request
+            if self.collection_size(collection) * n_pixels * len(bands) <= _SINGLE_REQUEST_MAX_VALUES:
+                payloads = self.collection_payloads(collection, bands)
+                if not payloads:
+                    return []
+                # sampleRectangle samples in the native projection, so the shape is that of the first image
+                stacks = _band_stacks(bands, len(payloads), np.shape(payloads[0]["bands"][bands[0]]), dtype)
+                for i, payload in enumerate(payloads):
+                    for band in bands:
+                        stacks[band][i] = payload["bands"].pop(band)
+                return [(payload, {band: stacks[band][i] for band in bands}) for i, payload in enumerate(payloads)]
+
+        payloads = self.collection_payloads(collection)
+        if not payloads:
+            return []
+        # images are looked up by asset id, only computed images need the whole collection listed server side
+        image_list = None if all(payload.get("id") for payload in payloads) else collection.toList(len(payloads))
+        stacks = _band_stacks(bands, len(payloads), (dimensions["height"], dimensions["width"]), dtype)
+
+        def _fetch(i):
+            # each worker fills its own slice of the stacks, so there is no list of intermediate arrays
+            image = ee.Image(payloads[i]["id"]) if image_list is None else ee.Image(image_list.get(i))
+            pixels = self.compute_pixels(image.select(bands), scale)
+            for band in bands:
+                stacks[band][i] = pixels[band]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_fetch, range(len(payloads))))
+        return [(payload, {band: stacks[band][i] for band in bands}) for i, payload in enumerate(payloads)]
+
+    @exception_handler(default_return_value={})
+    def load_geojson_or_shapefile(self, filepath):
+        # parsed once per file and modification time
+        return _load_area_file(filepath, os.stat(filepath).st_mtime_ns)
 
     @property
     def time_range(self):
         return self._time_range
 
-    @exception_handler(default_return_value={})
     @time_range.setter
     def time_range(self, value):
+        # like the area setter, invalid input raises instead of leaving the previous time range in place
         if isinstance(value, (tuple, list)) and len(value) == 2:
-            self._time_range = (ee.Date(value[0]), ee.Date(value[1]))
-        elif isinstance(value, str):
+            self._time_range = (_date(value[0]), _date(value[1]))
+        elif isinstance(value, str) and value.count("/") == 1:
             start, end = value.split("/")
-            self._time_range = (ee.Date(start), ee.Date(end))
+            self._time_range = (_date(start), _date(end))
         elif value is None:
             self._time_range = None
         else:
@@ -136,55 +479,74 @@ class SatelliteData(ABC):
         return collection
 
     @exception_handler(default_return_value={})
-    def convert_to_plotable_rgb(self, array_dict, scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0):
-        if gamma > 10:
-            self.logger.warning("Gamma value is very high. It may cause overflow errors.")
-        if gain > 10:
-            self.logger.warning("Gain value is very high. It may cause overflow errors.")
-        if red > 10:
-            self.logger.warning("Red value is very high. It may cause overflow errors.")
-        if green > 10:
-            self.logger.warning("Green value is very high. It may cause overflow errors.")
-        if blue > 10:
-            self.logger.warning("Blue value is very high. It may cause overflow errors.")
-
-        if gamma < 0.0001:
-            self.logger.warning("Gamma value is very low. It may cause underflow errors.")
-        if gain < 0.0001:
-            self.logger.warning("Gain value is very low. It may cause underflow errors.")
-        if red < 0.0001:
-            self.logger.warning("Red value is very low. It may cause underflow errors.")
-        if green < 0.0001:
-            self.logger.warning("Green value is very low. It may cause underflow errors.")
-        if blue < 0.0001:
-            self.logger.warning("Blue value is very low. It may cause underflow errors.")
-
-        bands = np.stack([array_dict[band] for band in sorted(array_dict.keys())], axis=-1)
-        if bands.shape[-1] == 1:
-            bands = np.dstack((bands, bands, bands))
-        # Normalize bands
+    def convert_to_plotable_rgb(self, array_dict, scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0, band_order=None):
+        """
+        ``array_dict`` as a uint8 image for imshow, the bands in ``band_order`` being the channels.
+
+        Without ``band_order`` the bands are taken in alphabetical order, so pass e.g. ``("B4", "B3", "B2")`` to get
+        red, green and blue in the right channels.
+        """
+        keys = band_order if band_order is not None else _sorted_bands(frozenset(array_dict))
+        if len(keys) == 1:
+            # a trailing axis on a C-contiguous array is a view, so a float32 band is not copied at all
+            bands = np.ascontiguousarray(array_dict[keys[0]], dtype=np.float32)[..., None]
+        else:
+            # every band is cast and written straight into its channel, no list of float32 copies to stack
+            bands = np.empty(np.shape(array_dict[keys[0]]) + (len(keys),), dtype=np.float32)
+            for i, band in enumerate(keys):
+                bands[..., i] = array_dict[band]
+        return self.stack_to_plotable_rgb(bands, scale, gamma, gain, red, green, blue)
+
+    @exception_handler(default_return_value={})
+    def stack_to_plotable_rgb(self, bands, scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0):
+        """
+        ``convert_to_plotable_rgb`` for bands already stacked as an (H, W, C) float32 array, the channels in order.
+
+        ``bands`` is only read, so a buffer reused between calls can be passed without copying it first.
+        """
+        params = np.array([gamma, gain, red, green, blue])
+        for name in _RGB_PARAM_NAMES[params > 10]:
+            self.logger.warning(f"{name} value is very high. It may cause overflow errors.")
+        for name in _RGB_PARAM_NAMES[params < 0.0001]:
+            self.logger.warning(f"{name} value is very low. It may cause underflow errors.")
+
+        # one and two bands are turned into three channels, see _rgb_kernel
+        out = np.empty(bands.shape[:-1] + (max(3, bands.shape[-1]),), dtype=np.uint8)
         min_val, max_val = bands.min(), bands.max()
-        norm_bands = (bands - min_val) / (max_val - min_val)
-        # Apply gamma correction
-        gamma_corrected = np.power(norm_bands, gamma)
-        # Apply gain
-        gain_applied = gamma_corrected * gain
-        # Apply individual color adjustments
-        gain_applied[..., 0] *= red
-        gain_applied[..., 1] *= green
-        if bands.shape[-1] == 2:
-            new_channel = (gain_applied[..., 0] + gain_applied[..., 1]) / (gain_applied[..., 0] - gain_applied[..., 1])
-            gain_applied = np.dstack((gain_applied, new_channel))
-            del new_channel
-        gain_applied[..., 2] *= blue
-
-        # Scale bands to the desired range
-        scaled_bands = gain_applied * scale
-        del bands, norm_bands, gamma_corrected, gain_applied
-        return np.clip(scaled_bands, 0, scale).astype(np.uint8)
+        inv_range = 1.0 / (max_val - min_val) if max_val != min_val else 0.0
+        channel_gains = np.array([red, green, blue], dtype=np.float32)
+        _rgb_kernel(bands, out, min_val, inv_range, gamma, gain, channel_gains, scale)
+        return out
+
+    def thumbnail(self, image, bands, min_val, max_val, gamma=1.0, gains=(1.0, 1.0, 1.0), dimensions=1024):
+        """
+        The three ``bands`` of the Earth Engine ``image`` as red, green and blue, rendered server side as a PNG over
+        ``self.area``.
+
+        The same stretch as ``convert_to_plotable_rgb``: ``((x - min_val) / (max_val - min_val)) ** gamma`` times the
+        per-channel ``gains`` (gain times red, green and blue), clipped to [0, 1]. Only the PNG of at most
+        ``dimensions`` pixels a side is transferred instead of the band arrays.
+
+        Returns:
+            (H, W, 3) float32 in [0, 1]
+        """
+        if gamma <= 0 or min(gains) <= 0:
+            raise ValueError("thumbnail needs a positive gamma and positive gains.")
+        rgb = ee.Image.cat([ee.Image(image).select(band) for band in bands]).rename(["red", "green", "blue"])
+        # Earth Engine applies norm ** (1 / gamma), and a gain k on norm ** gamma is a stretch to min + span / k ** (1 / gamma)
+        span = max_val - min_val
+        maxs = [min_val + span / channel_gain ** (1.0 / gamma) for channel_gain in gains]
+        vis = rgb.visualize(bands=["red", "green", "blue"], min=[min_val] * 3, max=maxs, gamma=1.0 / gamma)
+        url = vis.getThumbURL({"region": self.area, "dimensions": dimensions, "format": "png"})
+        with urllib.request.urlopen(url) as response:
+            return mpimg.imread(io.BytesIO(response.read()), format="png")[..., :3]
 
     @exception_handler(default_return_value={})
-    def upload2gdrive(self, image, satellite, task_id):
+    def upload2gdrive(self, image, satellite, task_id, wait=True):
+        """
+        Export ``image`` to Google Drive. With ``wait`` this blocks until the export is done, otherwise the started
+        task is returned so several exports can run at once and be waited for with ``wait_for_tasks``.
+        """
         if not self.allow_upload:
             self.logger.info("Upload to Google Drive is disabled.")
             return
@@ -201,7 +563,9 @@ class SatelliteData(ABC):
             fileFormat="GeoTIFF",
         )
         task.start()
-        self.wait_for_task(task)
+        if wait:
+            self.wait_for_task(task)
+        return task
 
     @exception_handler(default_return_value={})
     def validate_geometry(self, geo):
@@ -215,19 +579,21 @@ class SatelliteData(ABC):
 
     @exception_handler(default_return_value=None)
     def kill(self):
-        """Explicitly unloads the model from memory."""
-        if self._model is not None:
-            del self._model
-
-        attrs_to_delete = [
-            "_area",
-            "_time_range",
-        ]
-        for attr in attrs_to_delete:
+        """Explicitly unloads the downloaded data, area and time range from memory."""
+        self._release_data()
+        for attr in ("_area", "_time_range"):
             if hasattr(self, attr):
                 delattr(self, attr)
-        self._model = None
-        gc.collect()
+
+    def _release_data(self):
+        # the arrays are freed once nothing else refers to them, rebinding leaves lists callers kept untouched
+        self.images_data = []
+        if getattr(self, "ee_images", None) is not None:
+            self.ee_images = []
+        # per-download caches of the handlers: the band cube, the RGB stacking buffer and the displayed image
+        for attr in ("cube", "_rgb_buf", "_image"):
+            if getattr(self, attr, None) is not None:
+                setattr(self, attr, None)
 
     @property
     def allow_upload(self):
@@ -269,15 +635,35 @@ class SatelliteData(ABC):
 
     @exception_handler(default_return_value={})
     def wait_for_task(self, task):
+        self.wait_for_tasks([task])
+
+    def wait_for_tasks(self, tasks):
+        """
+        Wait until every export task in ``tasks`` is done, logging how each one ended.
+
+        The state is polled with exponential backoff, from ``_TASK_POLL_FIRST`` up to ``_TASK_POLL_MAX`` seconds, so quick
+        exports return almost right away and long ones cost few requests. Several tasks are polled together with a
+        single task list request.
+        """
+        pending = {task.id: task for task in tasks}
+        delay = _TASK_POLL_FIRST
         with tqdm(total=0, position=0, leave=True, bar_format="{l_bar}{bar} | {elapsed} elapsed") as pbar:
-            while task.active():
-                pbar.set_description(f"Task {task.id} is running")
-                time.sleep(30)
-            task_status = task.status()
-            self.logger.info(f"Task {task.id} completed with status: {task_status['state']}.")
-            if task_status["state"] != "COMPLETED":
-                self.logger.error(f"Task {task.id} failed with error: {task_status.get('error_message', 'No error message available')}")
-            pbar.set_description(f"Task {task.id} completed with status: {task_status['state']}")
+            while pending:
+                if len(pending) == 1:
+                    statuses = [task.status() for task in pending.values()]
+                else:
+                    statuses = [status for status in ee.data.getTaskList() if status["id"] in pending]
+                for status in statuses:
+                    if status["state"] not in _ACTIVE_TASK_STATES:
+                        del pending[status["id"]]
+                        self.logger.info(f"Task {status['id']} completed with status: {status['state']}.")
+                        if status["state"] != "COMPLETED":
+                            self.logger.error(f"Task {status['id']} failed with error: {status.get('error_message', 'No error message available')}")
+                if pending:
+                    pbar.set_description(f"Task {next(iter(pending))} is running" if len(pending) == 1 else f"{len(pending)} tasks are running")
+                    time.sleep(delay)
+                    delay = min(delay * 1.5, _TASK_POLL_MAX)
+            pbar.set_description(f"{len(tasks)} task(s) done")
 
     @abstractmethod
     def download_data(self):
@@ -296,8 +682,7 @@ class SatelliteData(ABC):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        del self._class_names
-        gc.collect()
+        self._release_data()
         if exc_type:
             self.logger.error(f"Exception occurred: {exc_val}", exc_info=True)
         return False
@@ -313,17 +698,6 @@ class SatelliteData(ABC):
             return NotImplemented
 
     def __sizeof__(self):
-        "size of numpy and the object itself. :"
-        total_size = super().__sizeof__()
-        for attr in self.__dict__.values():
-            if isinstance(attr, np.ndarray):
-                total_size += attr.nbytes
-            elif isinstance(attr, list):
-                total_size += sum(sys.getsizeof(item) for item in attr)
-        return (
-            total_size,
-            object.__sizeof__(self) + sum(sys.getsizeof(v) for v in self.__dict__.values()),
-        )
-
-    def __class__(self):
-        return "SatelliteData"
+        "size of the object itself plus its attributes, numpy arrays counted by their buffers."
+        seen = set()
+        return object.__sizeof__(self) + sum(_size(value, seen) for value in vars(self).values())
@@ -4,19 +4,79 @@ import ee
 from gge.sensors.SatelliteData import SatelliteData
 from gge.algorithms.band_math.indices import compute_NDVI, compute_EVI, compute_NDWI
 from gge.util import timing_decorator
-from typing import Tuple, Union
+from typing import Tuple, Union, List
 from datetime import datetime
+from numba import njit, prange
 from gge.util.types import PixelType, satelliteSensors
 
 
+# bands with REFLECTANCE_MULT/ADD_BAND_<n> factors in the image properties
+_REFLECTANCE_BANDS = frozenset(["SR_B1", "SR_B2", "SR_B3", "SR_B4", "SR_B5", "ST_B6", "SR_B7"])
+
+# indices that can be computed server side (see add_derived_bands), for the OLI collections only: on TM and ETM+
+# SR_B4 is NIR and SR_B5 SWIR1, so the band pairs below don't mean the same there
+_DERIVED_BANDS = frozenset(["NDVI", "NDWI"])
+_DERIVED_SENSORS = frozenset(["LC08", "LC09"])
+
+
+def _index_bands(name, landsat_number):
+    """
+    ``(a, b)`` with the index ``name`` of a Landsat ``landsat_number`` image being (a - b) / (a + b), as __getitem__
+    computes it on the client and add_derived_bands on the server.
+    """
+    if name == "NDVI":
+        return "SR_B5", "SR_B4"
+    if landsat_number in (4, 5, 7, 8):
+        return "SR_B3", "SR_B5"
+    return "SR_B3", "SR_B4"
+
+
+def _evi_bands(landsat_number):
+    """``(blue, red, nir)`` of a Landsat ``landsat_number`` image, in the argument order of compute_EVI."""
+    if landsat_number in (8, 9):
+        return "SR_B2", "SR_B4", "SR_B5"
+    # TM and ETM+ have no coastal aerosol band, so everything shifts down by one
+    return "SR_B1", "SR_B3", "SR_B4"
+
+
+# item types __getitem__ returns as a band of the image as is, and all valid item types
+_BAND_TYPES = frozenset(["SR_B1", "SR_B2", "SR_B3", "SR_B4", "SR_B5", "SR_B6", "SR_B7", "SR_B8"])
+_ITEM_TYPES = _BAND_TYPES | frozenset(["B8A", "B9", "B10", "B11", "B12", "ST_B10", "QA_PIXEL", "QA_RADSAT", "NDVI", "EVI", "NDWI", "RGB"])
+
+
+# fastmath without the no-NaN/no-inf assumptions, contract lets x * scale + offset be a single FMA
+@njit(parallel=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+def _affine_bands(src, scales, offsets, out, inverse):
+    """out[c] = src[c] * scales[c] + offsets[c], or with ``inverse`` the rounded (src[c] - offsets[c]) / scales[c]."""
+    n_bands, height, width = src.shape
+    # parallel over the rows of all bands, there are only a handful of bands
+    for row in prange(n_bands * height):
+        c, i = row // height, row % height
+        scale, offset = scales[c], offsets[c]
+        for j in range(width):
+            if inverse:
+                out[c, i, j] = np.rint((src[c, i, j] - offset) / scale)
+            else:
+                out[c, i, j] = src[c, i, j] * scale + offset
+
+
 class Landsat(SatelliteData):
+    pixel_scale = 30  # metres, the native resolution of the reflective bands
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
         time_range: Union[Tuple[Union[str, datetime], Union[str, datetime]], str, None] = None,
         cloud_threshold=10,
+        derived_bands: Union[List[str], None] = None,
     ):
         super().__init__(area, time_range)
+        self.derived_bands = [band.upper() for band in derived_bands or []]
+        unknown = set(self.derived_bands) - _DERIVED_BANDS
+        if unknown:
+            raise ValueError(f"Invalid derived bands {sorted(unknown)}, must be in {sorted(_DERIVED_BANDS)}.")
+        self.ee_images = []  # Earth Engine image of every entry of images_data, for server side rendering
+        self._rgb_buf = None  # (H, W, 3) float32 the RGB item stacks into, reallocated only when the shape changes
         self.cloud_threshold = cloud_threshold
         self.pixel_types = PixelType.DN
         self.satelliteSensors = satelliteSensors.landsat  # str(self.satelliteSensors.landsat)
@@ -44,105 +104,114 @@ class Landsat(SatelliteData):
                 .sort("system:time_start")
             )
 
-            count = collection.size().getInfo()
-            if count == 0:
+            images = self.collection_images(collection)
+            if not images:
                 print(f"No images found in collection {collection_id} for the given filters.")
                 continue
+            sensor = collection_id.split("/")[1]
+            if self.derived_bands and sensor in _DERIVED_SENSORS:
+                images = [self.add_derived_bands(image, int(sensor[3])) for image in images]
 
-            image_list = collection.toList(count)
-            if count > 0:
-                try:
-                    for i in range(count):
-                        image = ee.Image(image_list.get(i))
-                        self.images_data.append(self.convert_data(image))
-
-                except Exception as e:
-                    self.logger.error(f"Error converting image {image.id().getInfo()}: {e}")
-                    self.dwl_links = []
-                    if self._allow_upload:
-                        self.logger.info("Trying to upload to google drive")
-                        for i in range(count):
-                            image = ee.Image(image_list.get(i))
-                            image = image.toFloat()
-                            now = datetime.now()
-                            task_id = f"{now.strftime('%Y%m%dT%H%M')}"
-                            self.upload2gdrive(image=image, satellite=str(self.satelliteSensors), task_id=task_id)
-
-                            # 
+            converted = self.convert_images(images)
+            self.images_data.extend(data for data in converted if data is not None)
+            self.ee_images.extend(image for image, data in zip(images, converted) if data is not None)
 
-            else:
-                self.logger.info(f"No images found in collection {collection_id} for the given filters.")
+            failed = [image for image, data in zip(images, converted) if data is None]
+            if failed and self._allow_upload:
+                self.logger.info("Trying to upload to google drive")
+                # all exports are started first and then waited for together
+                now = datetime.now().strftime("%Y%m%dT%H%M")
+                tasks = [
+                    self.upload2gdrive(image=image.toFloat(), satellite=str(self.satelliteSensors), task_id=f"{now}_{i}", wait=False)
+                    for i, image in enumerate(failed)
+                ]
+                self.wait_for_tasks([task for task in tasks if task])
 
-    def convert_data(self, image):
-        band_names = image.bandNames().getInfo()
+    def add_derived_bands(self, image, landsat_number):
+        """
+        ``image`` (of Landsat ``landsat_number``) with the ``derived_bands`` indices added as bands, so they are
+        downloaded with the other bands.
 
-        band_data = {}
-        for band in band_names:
-            sample = image.select(band).sampleRectangle(region=self.area, defaultValue=0)
-            band_data[band] = np.array(sample.get(band).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        They are always computed from surface reflectance (the REFLECTANCE_MULT/ADD_BAND_<n> properties applied to the
+        DN), with the same bands as the client side indices of ``__getitem__``, which returns them only while
+        ``pixel_types`` is Reflectance.
+        """
+        for name in self.derived_bands:
+            reflectance = []
+            for band in _index_bands(name, landsat_number):
+                n = band[-1]
+                factors = image.getNumber(f"REFLECTANCE_MULT_BAND_{n}"), image.getNumber(f"REFLECTANCE_ADD_BAND_{n}")
+                reflectance.append(image.select(band).multiply(factors[0]).add(factors[1]))
+            image = image.addBands(ee.Image.cat(reflectance).normalizedDifference().rename(name))
+        return image
+
+    def convert_data(self, image):
+        # all bands, the date and the properties in one round trip (binary pixels for large areas)
+        return self.sample_image(image, scale=self.pixel_scale)
 
     def dn_to_reflectance(self):
         if self.pixel_types == PixelType.DN:
-            for img in self.images_data:
-                img["image_bands"] = self.convert_dn_to_reflectance(img["image_bands"], img["metadata"])
+            self._convert_band_dicts([(img["image_bands"], img["metadata"]) for img in self.images_data], inverse=False)
             self.pixel_types = PixelType.Reflectance
         else:
             self.logger.info("Data is already in Reflectance.")
 
     def reflectance_to_dn(self):
         if self.pixel_types == PixelType.Reflectance:
-            for img in self.images_data:
-                img["image_bands"] = self.convert_reflectance_to_dn(img["image_bands"], img["metadata"])
+            self._convert_band_dicts([(img["image_bands"], img["metadata"]) for img in self.images_data], inverse=True)
             self.pixel_types = PixelType.DN
         else:
             self.logger.info("Data is already in DN.")
 
-    def convert_dn_to_reflectance(self, band_data, metadata):
-        reflectance_data = {}
-        for band in band_data.keys():
-            if band in [
-                "SR_B1",
-                "SR_B2",
-                "SR_B3",
-                "SR_B4",
-                "SR_B5",
-                "ST_B6",
-                "SR_B7",
-            ]:
-                band_suffix = band[-1]  # Extracts 'B1' from 'SR_B1' etc
-
-                mult_key = f"REFLECTANCE_MULT_BAND_{band_suffix}"  # Forms 'BAND_1' from 'B1' etc
-                add_key = f"REFLECTANCE_ADD_BAND_{band_suffix}"
-                if mult_key in metadata and add_key in metadata:
-                    scale = float(metadata[mult_key])
-                    offset = float(metadata[add_key])
-                    reflectance_data[band] = (band_data[band] * scale) + offset
-                else:
-                    self.logger.warning(f"Reflectance scaling factors not found for {band}. Available keys: {list(metadata.keys())}")
-                    reflectance_data[band] = band_data[band]
-            else:
-                reflectance_data[band] = band_data[band]
-        return reflectance_data
+    def convert_dn_to_reflectance(self, band_data, metadata, inplace=False):
+        return self._convert_bands(band_data, metadata, inverse=False, inplace=inplace)
+
+    def convert_reflectance_to_dn(self, band_data, metadata, inplace=False):
+        return self._convert_bands(band_data, metadata, inverse=True, inplace=inplace)
+
+    def _convert_bands(self, band_data, metadata, inverse, inplace=False):
+        """
+        ``band_data`` with the reflectance bands converted between DN and reflectance (float32), or back to DN (int32)
+        with ``inverse``, using the REFLECTANCE_MULT/ADD_BAND_<n> factors in ``metadata``. Other bands are passed
+        through unchanged. With ``inplace`` the converted bands replace those in ``band_data`` itself, which is
+        returned, instead of a copy of it.
+        """
+        converted = band_data if inplace else dict(band_data)
+        self._convert_band_dicts([(converted, metadata)], inverse)
+        return converted
 
-    def convert_reflectance_to_dn(self, band_data, metadata):
-        dn_data = {}
-        for band in band_data.keys():
-            if band in ["SR_B1", "SR_B2", "SR_B3", "SR_B4", "SR_B5", "ST_B6", "SR_B7"]:
-                band_suffix = band[-1]
+    def _convert_band_dicts(self, items, inverse):
+        """
+        ``_convert_bands`` of every (band_data, metadata) pair in ``items``, in place.
 
+        The reflectance bands of the same shape, across all the images, are stacked into one (band, height, width)
+        array and converted in a single pass of ``_affine_bands`` with the factors of each band's own image, the dicts
+        then hold views into it.
+        """
+        groups = {}
+        for band_data, metadata in items:
+            for band in band_data.keys() & _REFLECTANCE_BANDS:
+                band_suffix = band[-1]  # Extracts '1' from 'SR_B1' etc
                 mult_key = f"REFLECTANCE_MULT_BAND_{band_suffix}"
                 add_key = f"REFLECTANCE_ADD_BAND_{band_suffix}"
                 if mult_key in metadata and add_key in metadata:
-                    scale = float(metadata[mult_key])
-                    offset = float(metadata[add_key])
-                    dn_data[band] = ((band_data[band] - offset) / scale).astype(np.int32)
+                    factors = (float(metadata[mult_key]), float(metadata[add_key]))
+                    groups.setdefault(np.shape(band_data[band]), []).append((band_data, band, factors))
                 else:
-                    self.logger.warning(f"DN conversion factors not found for {band}. Available keys: {list(metadata.keys())}")
-                    dn_data[band] = band_data[band]
-            else:
-                dn_data[band] = band_data[band]
-        return dn_data
+                    kind = "DN conversion" if inverse else "Reflectance scaling"
+                    self.logger.warning(f"{kind} factors not found for {band}. Available keys: {list(metadata.keys())}")
+
+        for shape, group in groups.items():
+            src = np.empty((len(group),) + shape, dtype=np.float32)
+            for c, (band_data, band, _) in enumerate(group):
+                src[c] = band_data[band]
+            # reflectance is computed in place, DN needs its own integer array
+            out = np.empty(src.shape, dtype=np.int32) if inverse else src
+            scales = np.array([factors[0] for _, _, factors in group])
+            offsets = np.array([factors[1] for _, _, factors in group])
+            _affine_bands(src, scales, offsets, out, inverse)
+            for c, (band_data, band, _) in enumerate(group):
+                band_data[band] = out[c]
 
     @property
     def item_type(self):
@@ -150,36 +219,7 @@ class Landsat(SatelliteData):
 
     @item_type.setter
     def item_type(self, value):
-        valid_bands = [
-            "SR_B1",
-            "SR_B2",
-            "SR_B3",
-            "SR_B4",
-            "SR_B5",
-            "SR_B6",
-            "SR_B7",
-            "SR_B8",
-            "B8A",
-            "B9",
-            "B10",
-            "B11",
-            "B12",
-            "SR_B1",
-            "SR_B2",
-            "SR_B3",
-            "SR_B4",
-            "SR_B5",
-            "SR_B6",
-            "SR_B7",
-            "ST_B10",
-            "QA_PIXEL",
-            "QA_RADSAT",
-            "NDVI",
-            "EVI",
-            "NDWI",
-            "RGB",
-        ]
-        if value.upper() in valid_bands:
+        if value.upper() in _ITEM_TYPES:
             self._item_type = value
         else:
             raise ValueError("Invalid item type.")
@@ -194,45 +234,49 @@ class Landsat(SatelliteData):
 
         landsat_number = int(metadata["LANDSAT_PRODUCT_ID"][3])
 
-        if self._item_type in ["SR_B1", "SR_B2", "SR_B3", "SR_B4", "SR_B5", "SR_B6", "SR_B7", "SR_B8"]:
+        if self._item_type in _BAND_TYPES:
             array = bands[self._item_type]
+        elif self._item_type.upper() in _DERIVED_BANDS and self._item_type.upper() in bands and self.pixel_types == PixelType.Reflectance:
+            # computed server side from reflectance at download (see add_derived_bands), in DN the client computes it
+            array = bands[self._item_type.upper()]
         elif self._item_type.upper() == "NDVI":
-            array = compute_NDVI(bands["SR_B4"], bands["SR_B5"])
+            nir, red = _index_bands("NDVI", landsat_number)
+            array = compute_NDVI(bands[red], bands[nir])
         elif self._item_type.upper() == "EVI":
-            array = compute_EVI(bands["SR_B4"], bands["SR_B5"], bands["SR_B2"])
+            blue, red, nir = _evi_bands(landsat_number)
+            array = compute_EVI(bands[blue], bands[red], bands[nir])
         elif self._item_type.upper() == "NDWI":
-            if landsat_number == 4 or landsat_number == 5:
-                array = compute_NDWI(bands["SR_B3"], bands["SR_B5"])
-            elif landsat_number == 7:
-                array = compute_NDWI(bands["SR_B3"], bands["SR_B5"])
-            elif landsat_number == 8:
-                array = compute_NDWI(bands["SR_B3"], bands["SR_B5"])
-            else:
-                try:
-                    array = compute_NDWI(bands["SR_B3"], bands["SR_B4"])
-                except KeyError:
-                    self.logger.error(f"Band {self._item_type} not found in the image.")
-                    array = None
+            a, b = _index_bands("NDWI", landsat_number)
+            try:
+                array = compute_NDWI(bands[a], bands[b])
+            except KeyError:
+                self.logger.error(f"Band {self._item_type} not found in the image.")
+                array = None
         elif self._item_type.upper() == "RGB":
-            array = self.convert_to_plotable_rgb(
-                {
-                    "SR_B4": bands["SR_B4"],
-                    "SR_B3": bands["SR_B3"],
-                    "SR_B2": bands["SR_B2"],
-                }
-            )
+            shape = np.shape(bands["SR_B4"]) + (3,)
+            if self._rgb_buf is None or self._rgb_buf.shape != shape:
+                self._rgb_buf = np.empty(shape, dtype=np.float32)
+            np.stack((bands["SR_B4"], bands["SR_B3"], bands["SR_B2"]), axis=-1, out=self._rgb_buf, casting="same_kind")
+            array = self.stack_to_plotable_rgb(self._rgb_buf)
         else:
             raise ValueError(f"Band {self._item_type} not found in the image.")
 
         return array, metadata
 
-    def display_rgb(self, index, bands=["SR_B4", "SR_B3", "SR_B2"], scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0):
+    def display_rgb(self, index, bands=["SR_B4", "SR_B3", "SR_B2"], scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0, server_side=False):
+        """
+        Show image ``index`` as RGB. With ``server_side`` Earth Engine renders it (see ``thumbnail``) from the image
+        kept at download, stretched to the min/max of the downloaded bands, instead of it being computed from the arrays.
+        """
         data = self.images_data[index]
         if data is not None:
-            rgb_image = self.convert_to_plotable_rgb({band: data["image_bands"][band] for band in bands}, scale, gamma, gain, red, green, blue)
+            if server_side:
+                arrays = [data["image_bands"][band] for band in bands]
+                min_val, max_val = float(min(np.min(a) for a in arrays)), float(max(np.max(a) for a in arrays))
+                gains = (gain * red, gain * green, gain * blue)
+                rgb_image = self.thumbnail(self.ee_images[index], bands, min_val, max_val, gamma, gains)
+            else:
+                rgb_image = self.convert_to_plotable_rgb(data["image_bands"], scale, gamma, gain, red, green, blue, band_order=bands)
             plt.imshow(rgb_image)
             plt.axis("off")
             plt.show()
-
-    def __class__(self):
-        return "Landsat"
@@ -8,6 +8,9 @@ from datetime import datetime
 
 
 class Sentinel1(SatelliteData):
+    pixel_scale = 10  # metres, the grid download_data aligns the images to
+    grid_crs = "EPSG:4326"
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -18,6 +21,7 @@ class Sentinel1(SatelliteData):
         day_range: Union[Tuple[int, int], None] = None,
     ):
         super().__init__(area, time_range)
+        self.ee_images = []  # Earth Engine image of every entry of images_data, for server side rendering
         self.year_range = year_range
         self.month_range = month_range
         self.hour_range = hour_range
@@ -49,53 +53,49 @@ class Sentinel1(SatelliteData):
             if self.day_range:
                 collection = collection.filter(ee.Filter.calendarRange(self.day_range[0], self.day_range[1], "day"))
 
-            count = collection.size().getInfo()
-            if count == 0:
+            images = self.collection_images(collection)
+            if not images:
                 print(f"No images found in collection {collection_id} for the given filters.")
                 continue
             # help me here. 
             # 
 
             # Define a fixed grid with a specific resolution and CRS (pretty improtant to make sure that the HxW pixels of all subsets are the same)
-            # can change the projection and scale though...
-            target_projection = "EPSG:4326"
-            target_scale = 10
-            fixed_grid = self.area.bounds()
-
-            # Process each image
-            image_list = collection.toList(count)
-            for i in range(count):
-                image = ee.Image(image_list.get(i))
-                try:
-                    # Align the image to the fixed grid
-                    aligned_image = (
-                        image.reproject(crs=target_projection, scale=target_scale)
-                        .resample("bilinear")  # Resample to align pixels
-                        .clip(fixed_grid)  # Clip to the fixed grid
-                    )
+            # can change the projection and scale though (grid_crs and pixel_scale)...
+            # the bounding box is a literal polygon built once, not a bounds() of the area in every request
+            fixed_grid = self.area_bbox
 
-                    # Convert the processed image
-                    self.images_data.append(self.convert_data(aligned_image))
-                except Exception as e:
-                    self.logger.error(f"Error processing image {image.id().getInfo()}: {e}")
+            # Align every image to the fixed grid, then convert them concurrently
+            aligned_images = [
+                image.reproject(crs=self.grid_crs, scale=self.pixel_scale)
+                .resample("bilinear")  # Resample to align pixels
+                .clip(fixed_grid)  # Clip to the fixed grid
+                for image in images
+            ]
+            converted = self.convert_images(aligned_images)
+            self.images_data.extend(data for data in converted if data is not None)
+            self.ee_images.extend(image for image, data in zip(aligned_images, converted) if data is not None)
 
     def convert_data(self, image):
-        # Select the polarizations and apply logarithmic scaling to convert to dB
-        band_data = {}
-        for band in self.bands2dwl:
-            # Logarithmic scale conversion from linear to dB for better visual interpretation
-            db_image = image.select(band)  # .log10().multiply(10.0)
-            sample = db_image.sampleRectangle(region=self.area, defaultValue=0)
-            band_data[band] = np.array(sample.get(band).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        # the polarizations, the date and the properties in one round trip
+        # (for dB, sample image.log10().multiply(10.0) instead)
+        # the images are clipped to the bounding box anyway, so it is sampled instead of the full area geometry
+        return self.sample_image(image, self.bands2dwl, scale=self.pixel_scale, region=self.area_bbox)
 
-    def display_rgb(self, index, bands=["VV", "VH", "VV"], scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0):
+    def display_rgb(self, index, bands=["VV", "VH", "VV"], scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0, server_side=False):
+        """
+        Show image ``index`` as RGB. With ``server_side`` Earth Engine renders it (see ``thumbnail``) from the image
+        kept at download, stretched to the min/max of the downloaded bands, instead of it being computed from the arrays.
+        """
         data = self.images_data[index]
         if data is not None:
-            rgb_image = self.convert_to_plotable_rgb({band: data["image_bands"][band] for band in bands}, scale, gamma, gain, red, green, blue)
+            if server_side:
+                arrays = [data["image_bands"][band] for band in bands]
+                min_val, max_val = float(min(np.min(a) for a in arrays)), float(max(np.max(a) for a in arrays))
+                gains = (gain * red, gain * green, gain * blue)
+                rgb_image = self.thumbnail(self.ee_images[index], bands, min_val, max_val, gamma, gains)
+            else:
+                rgb_image = self.convert_to_plotable_rgb(data["image_bands"], scale, gamma, gain, red, green, blue, band_order=bands)
             plt.imshow(rgb_image)
             plt.axis("off")  # Hide axis
             plt.show()
-
-    def __class__(self):
-        return "Sentinel1"
@@ -7,9 +7,28 @@ from gge.util import timing_decorator, exception_handler
 from typing import Tuple, Union
 from datetime import datetime
 from gge.util.types import PixelType
+from googleapiclient.errors import HttpError
+
+
+# bands stored as reflectance times the quantification value (the aerosol, vapour and cirrus bands included)
+_REFLECTANCE_BANDS = frozenset(["B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B9", "B11", "B12"])
+_QUANTIFICATION_VALUE = 10000
+
+# item types computed from the bands, with the bands their compute_* function takes
+_INDICES = {
+    "NDVI": (compute_NDVI, ("B4", "B8")),
+    "EVI": (compute_EVI, ("B2", "B4", "B8")),
+    "NDWI": (compute_NDWI, ("B3", "B8")),
+}
+
+# item types that are a band of the image, and all valid item types
+_BAND_TYPES = frozenset(["B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B9", "B10", "B11", "B12", "QA10", "QA20", "QA60"])
+_ITEM_TYPES = _BAND_TYPES | frozenset(_INDICES) | {"RGB"}
 
 
 class Sentinel2(SatelliteData):
+    pixel_scale = 10  # metres, the native resolution of the visible and NIR bands
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -19,14 +38,14 @@ class Sentinel2(SatelliteData):
         super().__init__(area, time_range)
         self.cloud_threshold = cloud_threshold
         self.pixel_types = PixelType.DN
+        self._max_workers = 16  # concurrent Earth Engine requests, well within the per-account quota
 
         self.reducer_function = "mean"
         self.reduction_scale = 500
 
     @timing_decorator
-    @exception_handler(default_return_value={})
+    @exception_handler(default_return_value={}, exceptions=(ee.EEException, HttpError))
     def download_data(self):
-        self._use_reducer = False
         collections = ["COPERNICUS/S2_SR_HARMONIZED"]
 
         for collection_id in collections:
@@ -38,93 +57,101 @@ class Sentinel2(SatelliteData):
                 .sort("system:time_start")
             )
 
-            count = collection.size().getInfo()
-            if count == 0:
+            images = self.collection_images(collection)
+            if not images:
                 self.logger.info(f"No images found in collection {collection_id} for the given filters.")
                 continue
 
-            image_list = collection.toList(count)
-            for i in range(count):
-                if self._use_reducer is False:
-                    try:
-                        image = ee.Image(image_list.get(i))
-                        self.images_data.append(self.convert_data(image))
-                    except Exception as e:
-                        self.logger.error(f"Error converting image {image.id().getInfo()}: \nUse Reducer: {self._use_reducer}\nError: {e}")
-                        if i == 0:
-                            self.logger.info("Trying to change the reducer function and scale.")
-                        self._use_reducer = True
-                else:
-                    try:
-                        image = ee.Image(image_list.get(i))
-                        # Set default projection before reducing resolution
-                        default_projection = image.select(0).projection()  # Assuming band 0 has a valid projection
-                        image = (
-                            image.setDefaultProjection(default_projection)
-                            .reduceResolution(reducer=self._reducer_function, maxPixels=6024)
-                            .reproject("EPSG:4326", None, self.reduction_scale)
-                        )
-
-                        self.images_data.append(self.convert_data(image))
-                    except Exception as e:
-                        self.logger.error(f"Error converting image {image.id().getInfo()}: \nUse Reducer: {self._use_reducer}\nError: {e}")
-                        self._use_reducer = False
-
-    def convert_data(self, image):
-        band_names = image.bandNames().getInfo()
-
-        band_data = {}
-        for band in band_names:
-            sample = image.select(band).sampleRectangle(region=self.area, defaultValue=0)
-            band_data[band] = np.array(sample.get(band).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+            # every image is converted concurrently, the ones that fail (too many pixels) are tried again at
+            # reduction_scale with the reducer function
+            converted = self.convert_images(images, max_workers=self._max_workers)
+            failed = [i for i, data in enumerate(converted) if data is None]
+            if failed:
+                self.logger.info(f"Trying to change the reducer function and scale for {len(failed)} images.")
+                reduced = [self.reduce_image(images[i]) for i in failed]
+                # the reducer averages, so the reduced bands are kept as float32
+                retried = self.convert_images(reduced, self._max_workers, lambda image: self.convert_data(image, self.reduction_scale, np.float32))
+                for i, data in zip(failed, retried):
+                    converted[i] = data
+            self.images_data.extend(data for data in converted if data is not None)
+
+    def reduce_image(self, image):
+        """``image`` reduced with ``reducer_function`` to ``reduction_scale`` metres on EPSG:4326."""
+        # Set default projection before reducing resolution
+        default_projection = image.select(0).projection()  # Assuming band 0 has a valid projection
+        return (
+            image.setDefaultProjection(default_projection)
+            .reduceResolution(reducer=self._reducer_function, maxPixels=6024)
+            .reproject("EPSG:4326", None, self.reduction_scale)
+        )
+
+    def convert_data(self, image, scale=None, dtype=np.uint16):
+        # all bands resampled to one grid of scale (pixel_scale by default) metres and fetched as binary in one
+        # request, the date and properties in a second one
+        # every band of the SR product is an unsigned integer of at most 16 bits, so uint16 holds them exactly at half
+        # the memory of float32 (the conversions, indices and RGB work in float32 anyway)
+        return self.sample_image(image, scale=self.pixel_scale if scale is None else scale, dtype=dtype, binary=True)
 
     def dn_to_reflectance(self):
         if self.pixel_types == PixelType.DN:
+            self._convert_band_dicts([img["image_bands"] for img in self.images_data], inverse=False)
             for img in self.images_data:
-                img["image_bands"] = self.convert_dn_to_reflectance(img["image_bands"], img["metadata"])
+                img.pop("indices", None)
             self.pixel_types = PixelType.Reflectance
         else:
             self.logger.info("Data is already in Reflectance.")
 
     def reflectance_to_dn(self):
         if self.pixel_types == PixelType.Reflectance:
+            self._convert_band_dicts([img["image_bands"] for img in self.images_data], inverse=True)
             for img in self.images_data:
-                img["image_bands"] = self.convert_reflectance_to_dn(img["image_bands"], img["metadata"])
+                img.pop("indices", None)
             self.pixel_types = PixelType.DN
         else:
             self.logger.info("Data is already in DN.")
 
-    def convert_dn_to_reflectance(self, band_data, metadata):
+    def convert_dn_to_reflectance(self, band_data, metadata, inplace=False):
         """
         see S2_MSI_Product_Specification page 403..
         """
-        reflectance_data = {}
-        for band in band_data.keys():
-            if band in ["B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B9", "B11", "B12"]:
-                try:
-                    #  band_suffix = "".join(filter(str.isdigit, band))
-                    reflectance_data[band] = band_data[band] / 10000
-                except:
-                    self.logger.warning(f"Reflectance scaling factors not found for {band}. Available keys: {list(metadata.keys())}")
-                    reflectance_data[band] = band_data[band]
-            else:
-                reflectance_data[band] = band_data[band]
-        return reflectance_data
-
-    def convert_reflectance_to_dn(self, band_data, metadata):
-        dn_data = {}
-        for band in band_data.keys():
-            if band in ["SR_B1", "SR_B2", "SR_B3", "SR_B4", "SR_B5", "ST_B6", "SR_B7"]:
-                try:
-                    #  band_suffix = band[-1]
-                    dn_data[band] = (band_data[band] * 10000).astype(np.int32)
-                except:
-                    self.logger.warning(f"DN conversion factors not found for {band}. Available keys: {list(metadata.keys())}")
-                    dn_data[band] = band_data[band]
+        return self._convert_bands(band_data, inverse=False, inplace=inplace)
+
+    def convert_reflectance_to_dn(self, band_data, metadata, inplace=False):
+        return self._convert_bands(band_data, inverse=True, inplace=inplace)
+
+    def _convert_bands(self, band_data, inverse, inplace=False):
+        """
+        ``band_data`` with the reflectance bands divided by ``_QUANTIFICATION_VALUE`` (float32), or multiplied by it and
+        rounded back to DN (int32) with ``inverse``. Other bands are passed through unchanged. With ``inplace`` the
+        converted bands replace those in ``band_data`` itself, which is returned, instead of a copy of it.
+        """
+        converted = band_data if inplace else dict(band_data)
+        self._convert_band_dicts([converted], inverse)
+        return converted
+
+    def _convert_band_dicts(self, band_dicts, inverse):
+        """
+        ``_convert_bands`` of every dict in ``band_dicts``, in place.
+
+        The reflectance bands of the same shape, across all the dicts, are stacked into one (band, height, width) array
+        and converted with a single NumPy call, the dicts then hold views into it.
+        """
+        groups = {}
+        for band_data in band_dicts:
+            for band in band_data.keys() & _REFLECTANCE_BANDS:
+                groups.setdefault(np.shape(band_data[band]), []).append((band_data, band))
+        for shape, group in groups.items():
+            stack = np.empty((len(group),) + shape, dtype=np.float32)
+            for c, (band_data, band) in enumerate(group):
+                stack[c] = band_data[band]
+            if inverse:
+                # rounded rather than truncated, so DN -> reflectance -> DN gives the DN back
+                np.multiply(stack, _QUANTIFICATION_VALUE, out=stack)
+                out = np.rint(stack, out=stack).astype(np.int32)
             else:
-                dn_data[band] = band_data[band]
-        return dn_data
+                out = np.divide(stack, _QUANTIFICATION_VALUE, out=stack)
+            for c, (band_data, band) in enumerate(group):
+                band_data[band] = out[c]
 
     @property
     def reducer_function(self):
@@ -162,28 +189,7 @@ class Sentinel2(SatelliteData):
 
     @item_type.setter
     def item_type(self, value):
-        if value in [
-            "B1",
-            "B2",
-            "B3",
-            "B4",
-            "B5",
-            "B6",
-            "B7",
-            "B8",
-            "B8A",
-            "B9",
-            "B10",
-            "B11",
-            "B12",
-            "QA10",
-            "QA20",
-            "QA60",
-            "NDVI",
-            "EVI",
-            "NDWI",
-            "RGB",
-        ]:
+        if value in _ITEM_TYPES:
             self._item_type = value
         else:
             raise ValueError("Invalid item type.")
@@ -194,20 +200,21 @@ class Sentinel2(SatelliteData):
         metadata = img.get("metadata")
         bands = img.get("image_bands")
 
-        if self._item_type in ["B1", "B2", "B3", "B4", "B5", "B6", "B7", "B8", "B8A", "B9", "B10", "B11", "B12", "QA10", "QA20", "QA60"]:
+        if self._item_type in _BAND_TYPES:
             try:
                 array = bands[self._item_type]
             except KeyError:
                 self.logger.warning(f"Band {self._item_type} not found in the image.")
                 raise ValueError(f"Band {self._item_type} not found in the image.")
-        elif self._item_type == "NDVI":
-            array = compute_NDVI(bands["B4"], bands["B8"])
-        elif self._item_type == "EVI":
-            array = compute_EVI(bands["B4"], bands["B8"], bands["B2"])
-        elif self._item_type == "NDWI":
-            array = compute_NDWI(bands["B3"], bands["B8"])
+        elif self._item_type in _INDICES:
+            # computed once per image and kept with it, dn_to_reflectance and reflectance_to_dn drop them
+            indices = img.setdefault("indices", {})
+            if self._item_type not in indices:
+                compute, band_names = _INDICES[self._item_type]
+                indices[self._item_type] = compute(*(bands[band] for band in band_names))
+            array = indices[self._item_type]
         elif self._item_type.upper() == "RGB":
-            array = self.convert_to_plotable_rgb({band: bands[band] for band in ["B4", "B3", "B2"]})
+            array = self.convert_to_plotable_rgb(bands, band_order=("B4", "B3", "B2"))
         else:
             raise ValueError(f"Band {self._item_type} not found in the image.")
 
@@ -216,13 +223,10 @@ class Sentinel2(SatelliteData):
     def display_rgb(self, index, bands=["B4", "B3", "B2"], scale=255, gamma=1.0, gain=1.0, red=1.0, green=1.0, blue=1.0):
         data = self.images_data[index]
         if data is not None:
-            rgb_image = self.convert_to_plotable_rgb({band: data["image_bands"][band] for band in bands}, scale, gamma, gain, red, green, blue)
+            rgb_image = self.convert_to_plotable_rgb(data["image_bands"], scale, gamma, gain, red, green, blue, band_order=bands)
             plt.imshow(rgb_image)
             plt.axis("off")
             plt.show()
 
     def __len__(self):
         return len(self.images_data)
-
-    def __class__(self):
-        return "Sentinel2"
@@ -9,8 +9,14 @@ import time
 from googleapiclient.errors import HttpError
 import random
 
+# seconds to wait before each retry after a server error (plus up to half a second of jitter)
+_BACKOFFS = (1.0, 2.0, 4.0, 8.0, 16.0)
+_RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
 
 class Sentinel3(SatelliteData):
+    pixel_scale = 300  # metres, the OLCI full resolution
+
     def __init__(
         self,
         area: Union[Tuple[float, float, float, float], str, None] = None,
@@ -26,7 +32,7 @@ class Sentinel3(SatelliteData):
 
         for collection_id in collections:
             retry_count = 0
-            while retry_count < 5:
+            while retry_count < len(_BACKOFFS):
                 try:
                     collection = (
                         ee.ImageCollection(collection_id)
@@ -37,21 +43,19 @@ class Sentinel3(SatelliteData):
                         # .filter(ee.Filter.lt("CLOUDY_PIXEL_PERCENTAGE", self.cloud_threshold))
                     )
 
-                    count = collection.size().getInfo()
-                    if count == 0:
+                    images = self.collection_images(collection)
+                    if not images:
                         print(f"No images found in collection {collection_id} for the given filters.")
                         break
 
-                    image_list = collection.toList(count)
-                    for i in range(count):
-                        image = ee.Image(image_list.get(i))
-                        self.images_data.append(self.convert_data(image))
+                    # converted concurrently, images that fail are logged and left out
+                    self.images_data.extend(data for data in self.convert_images(images) if data is not None)
                     break  # Break from the retry loop on success
 
                 except HttpError as e:
-                    if e.resp.status in [500, 502, 503, 504]:
-                        sleep_time = (2**retry_count) + (random.random() * 0.5)
-                        print(f"Retrying... {retry_count + 1}/5 after {sleep_time:.2f}s due to server error")
+                    if e.resp.status in _RETRY_STATUSES:
+                        sleep_time = _BACKOFFS[retry_count] + random.random() * 0.5
+                        print(f"Retrying... {retry_count + 1}/{len(_BACKOFFS)} after {sleep_time:.2f}s due to server error")
                         time.sleep(sleep_time)
                         retry_count += 1
                     else:
@@ -60,17 +64,20 @@ class Sentinel3(SatelliteData):
                     self.logger.error(f"Error converting image: {e}")
                     break  # Exit on any other type of error
 
-            if retry_count == 5:
-                print("Failed after 5 retries.")
+            if retry_count == len(_BACKOFFS):
+                print(f"Failed after {len(_BACKOFFS)} retries.")
 
     def convert_data(self, image):
-        band_names = image.bandNames().getInfo()  # Example bands from OLCI and SLSTR
-
-        band_data = {}
-        for band in band_names:
-            sample = image.select(band).sampleRectangle(region=self.area, defaultValue=0)
-            band_data[band] = np.array(sample.get(band).getInfo())
-        return {"image_bands": band_data, "time": image.date().format().getInfo(), "metadata": image.getInfo()["properties"]}
+        # all bands (OLCI or SLSTR), the date and the properties in one round trip
+        # server errors are retried here, in the worker thread, so the other images keep downloading meanwhile
+        for backoff in _BACKOFFS:
+            try:
+                return self.sample_image(image, scale=self.pixel_scale)
+            except HttpError as e:
+                if e.resp.status not in _RETRY_STATUSES:
+                    raise
+                time.sleep(backoff + random.random() * 0.5)
+        return self.sample_image(image, scale=self.pixel_scale)
 
     def convert_radiance_to_temperature(self, band_data, metadata):
         temperature_data = {}
@@ -91,13 +98,10 @@ class Sentinel3(SatelliteData):
     ):
         data = self.images_data[index]
         if data is not None:
-            rgb_image = self.convert_to_plotable_rgb({band: data["image_bands"][band] for band in bands}, scale, gamma, gain, red, green, blue)
+            rgb_image = self.convert_to_plotable_rgb(data["image_bands"], scale, gamma, gain, red, green, blue, band_order=bands)
             plt.imshow(rgb_image)
             plt.axis("off")  # Hide axis
             plt.show()
 
     def __len__(self):
         return len(self.images_data)
-
-    def __class__(self):
-        return "Sentinel3"
@@ -0,0 +1,51 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# downloaded images_data, one .npz per request; override the location with the GGE_CACHE_DIR environment variable
+CACHE_DIR = os.environ.get("GGE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "gge_ee"))
+
+
+def cache_key(*parts) -> str:
+    """Stable hash of the JSON representation of ``parts`` (collection id, area, time range, band, ...)."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.npz")
+
+
+def load_images_data(key: str):
+    """
+    The images_data list saved under ``key`` by ``save_images_data``, or None if nothing is cached.
+
+    Returns:
+        list of dicts, with the arrays restored under their original keys
+    """
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as cached:
+        records = json.loads(str(cached["records"]))
+        for i, record in enumerate(records):
+            for name in record.pop("_arrays"):
+                record[name] = cached[f"{i}/{name}"]
+    return records
+
+
+def save_images_data(key: str, images_data: list) -> None:
+    """Save a list of images_data dicts (NumPy arrays plus JSON serialisable values) under ``key``."""
+    arrays, records = {}, []
+    for i, data in enumerate(images_data):
+        record = {name: value for name, value in data.items() if not isinstance(value, np.ndarray)}
+        record["_arrays"] = [name for name, value in data.items() if isinstance(value, np.ndarray)]
+        arrays.update({f"{i}/{name}": data[name] for name in record["_arrays"]})
+        records.append(record)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(key)
+    # write next to the target and rename, so an interrupted save never leaves a truncated cache entry
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, records=json.dumps(records), **arrays)
+    os.replace(tmp_path, path)
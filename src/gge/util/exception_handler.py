@@ -1,37 +1,41 @@
 import time  # python in-built module
 import logging  # python in-built module
+import functools  # python in-built module
 
 
 def timing_decorator(func):
+    name = func.__name__
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        # monotonic, unlike time.time(), and the message is only formatted if INFO is enabled
+        start_time = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.time()
-        logging.info(
-            f"{func.__name__} executed in {end_time - start_time:.3f} seconds."
-        )
+        logging.info("%s executed in %.3f seconds.", name, (time.perf_counter_ns() - start_time) / 1e9)
         return result
 
     return wrapper
 
 
-def exception_handler(default_return_value=None):
+def exception_handler(default_return_value=None, exceptions=(Exception,)):
     """
     A decorator factory to catch exceptions, log them, and return a specified default value.
 
     Args:
         default_return_value: The value to return in case an exception is caught. Defaults to None.
+        exceptions: The exception types to catch, others propagate. Defaults to every Exception.
 
     Returns:
         A decorator that wraps the function and provides exception handling.
     """
 
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
-            except Exception as e:
-                logging.error(f"An error occurred in {func.__name__}: {str(e)}")
+            except exceptions as e:
+                logging.error("An error occurred in %s: %s", func.__name__, e)
                 # Return the specified default value in case of an exception.
                 return default_return_value
 
@@ -1,25 +1,31 @@
 def extract_geometry_coordinates(geojson):
     """
-    Recursively search for 'geometry' in a GeoJSON structure and extract coordinates.
+    Search for 'geometry' in a GeoJSON structure and extract coordinates.
+
+    The structure is walked depth first with an explicit stack, in the same order a recursive search would take, so
+    the first geometry is returned however deeply it is nested.
 
     :param geojson: The GeoJSON structure.
     :return: The coordinates if found, otherwise None.
     """
-    if isinstance(geojson, dict):
-        # If the current element is a dictionary, check for 'geometry' key
-        if 'geometry' in geojson and 'coordinates' in geojson['geometry']:
-            return geojson['geometry']['coordinates']
-        else:
-            # Recursively search in each value of the dictionary
-            for key, value in geojson.items():
-                result = extract_geometry_coordinates(value)
-                if result is not None:
-                    return result
-    elif isinstance(geojson, list):
-        # If the current element is a list, recursively search in each item
-        for item in geojson:
-            result = extract_geometry_coordinates(item)
-            if result is not None:
-                return result
+    # FeatureCollections, the common case: the geometry is on the first feature that has one
+    if isinstance(geojson, dict) and "geometry" not in geojson and isinstance(geojson.get("features"), list):
+        for feature in geojson["features"]:
+            geometry = feature.get("geometry") if isinstance(feature, dict) else None
+            if isinstance(geometry, dict) and "coordinates" in geometry:
+                return geometry["coordinates"]
+
+    stack = [geojson]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            # If the current element is a dictionary, check for 'geometry' key
+            geometry = node.get("geometry")
+            if isinstance(geometry, dict) and "coordinates" in geometry:
+                return geometry["coordinates"]
+            # reversed, so the values are visited in order
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
     # Return None if no geometry is found
-    return None
\ No newline at end of file
+    return None
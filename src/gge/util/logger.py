@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 
 
 class CustomFormatter(logging.Formatter):
@@ -19,12 +20,18 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset,
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # one formatter per level, built once rather than for every record
+        self._formatters = {level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()}
+        self._default_formatter = logging.Formatter()  # levels without a format of their own
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        return self._formatters.get(record.levelno, self._default_formatter).format(record)
 
 
+# configures the root logger once, every later call returns it as is instead of stacking handlers on it
+@lru_cache(maxsize=None)
 def setup_logging():
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)  # Set the root logger level
@@ -0,0 +1,13 @@
+import numpy as np
+
+from gge.models.som import SOM
+
+
+def test_train_batch_loss_decreases():
+    # data away from the [0, 1) initial weights, so the map has to move to it
+    data = np.random.default_rng(0).random((400, 3)) + 5
+    som = SOM(num_neurons=(2, 2), input_dim=3, learning_rate=0.5, epochs=10)
+    som.train_batch(data)
+    assert som.history[-1] < som.history[0]
+    assert np.all(np.diff(som.history[1:]) <= 1e-6)
+    assert np.all((som.weights > 4) & (som.weights < 7))